@@ -0,0 +1,151 @@
+from PyQt5.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex
+)
+
+
+class DownloadTableModel(QAbstractTableModel):
+    """ Table model that shows the items of a DownloadList.
+
+    The model reads the cells straight from the DownloadItem objects, the
+    view only asks for the visible rows. refresh() compares the cells of
+    an item with the ones it showed the last time and emits dataChanged
+    only for the cells that changed.
+
+    The row count is kept by the model and moves only through the begin/end
+    notifications (sync_rows, remove_row, move_row, reset), so items that a
+    worker thread appends to the list show up on the next sync_rows() call.
+
+    Args:
+        download_list (DownloadList): List that holds the items.
+
+        columns (list): (progress_stats key, header label) of each column.
+
+    """
+
+    def __init__(self, download_list, columns, parent=None):
+        super(DownloadTableModel, self).__init__(parent)
+        self._download_list = download_list
+        self._columns = columns
+        self._row_count = 0
+
+        # object_id -> cell values shown the last time, see refresh()
+        self._shown = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+
+        return self._cell(self.item(index.row()), self._columns[index.column()][0])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+
+        if orientation == Qt.Horizontal:
+            return self._columns[section][1]
+        return str(section + 1)
+
+    def item(self, row):
+        # Return the DownloadItem shown on the given row
+        #
+        object_id = self._download_list.get_objectid_by_index(row)
+        return self._download_list.get_item_by_objectid(object_id)
+
+    def sync_rows(self):
+        # Show the items appended to the download list since the last call
+        #
+        count = len(self._download_list)
+
+        if count > self._row_count:
+            self.beginInsertRows(QModelIndex(), self._row_count, count - 1)
+            self._row_count = count
+            self.endInsertRows()
+
+    def remove_row(self, row):
+        # Remove the item of the given row from the download list.
+        # Returns False if the item is 'Active'
+        #
+        object_id = self._download_list.get_objectid_by_index(row)
+
+        if self._download_list.get_item_by_objectid(object_id).stage == 'Active':
+            return False
+
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._download_list.remove(object_id)
+        self._row_count -= 1
+        self._shown.pop(object_id, None)
+        self.endRemoveRows()
+
+        return True
+
+    def move_row(self, row, up):
+        # Move the item of the given row one step up (or down).
+        # Returns the new row or -1 if it can not move
+        #
+        new_row = row - 1 if up else row + 1
+
+        if new_row < 0 or new_row >= self._row_count:
+            return -1
+
+        # beginMoveRows() takes the row the item goes before
+        destination = new_row if up else new_row + 1
+        object_id = self._download_list.get_objectid_by_index(row)
+
+        self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), destination)
+
+        if up:
+            self._download_list.move_up(object_id)
+        else:
+            self._download_list.move_down(object_id)
+
+        self.endMoveRows()
+
+        return new_row
+
+    def reset(self):
+        # Re-read the whole download list (after clear())
+        #
+        self.beginResetModel()
+        self._row_count = len(self._download_list)
+        self._shown.clear()
+        self.endResetModel()
+
+    def refresh(self, object_id):
+        # Emit dataChanged for the cells of the item that changed
+        #
+        row = self._download_list.index(object_id)
+
+        if row < 0 or row >= self._row_count:
+            return
+
+        item = self._download_list.get_item_by_objectid(object_id)
+        values = tuple(self._cell(item, key) for key, _ in self._columns)
+        shown = self._shown.get(object_id)
+
+        self._shown[object_id] = values
+
+        for column, value in enumerate(values):
+            if shown is None or shown[column] != value:
+                cell = self.index(row, column)
+                self.dataChanged.emit(cell, cell, [Qt.DisplayRole])
+
+    def _cell(self, download_item, key):
+        progress_stats = download_item.progress_stats
+
+        if key == 'status' and progress_stats['playlist_index']:
+            # Not the best place but we build the playlist status here
+            return '{0} {1}/{2}'.format(progress_stats['status'],
+                                        progress_stats['playlist_index'],
+                                        progress_stats['playlist_size'])
+
+        return progress_stats[key]
@@ -0,0 +1,203 @@
+import os
+import re
+import mmap
+
+from array import array
+from bisect import bisect_right
+
+from PyQt5.QtCore import (
+    Qt, QAbstractListModel, QModelIndex
+)
+
+_NEWLINE = re.compile(b'\n')
+
+
+def find_in_file(path, pattern, start, end):
+    """Return the offset of the first pattern (bytes) in path[start:end],
+    wrapping around to the beginning of the file, or -1 if not found.
+
+    Opens its own map of the file so it can run on any thread.
+    """
+    with open(path, 'rb') as log:
+        size = os.fstat(log.fileno()).st_size
+        end = min(end, size)
+
+        if not pattern or not end:
+            return -1
+
+        with mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset = data.find(pattern, start, end)
+
+            if offset == -1 and start > 0:
+                offset = data.find(pattern, 0, min(start + len(pattern), end))
+
+            return offset
+
+
+class LogFileModel(QAbstractListModel):
+    """ List model that shows the lines of a growing text file.
+
+    Only the offsets of the line starts are kept, the view asks for the
+    visible rows and each one is read from the file when it is drawn.
+    poll() maps the file and indexes at most INDEX_CHUNK new bytes per
+    call, so a big file shows up at once and is indexed over the next
+    calls without blocking the GUI, and a file that was cleared or rotated
+    (new inode or smaller than the indexed part) is indexed again.
+
+    The file is never kept open between two calls, an open handle would
+    make the rotation of LogManager fail on Windows.
+
+    Attributes:
+        INDEX_CHUNK (int): Max bytes indexed by one poll() call.
+
+        CACHE_LINES (int): Max number of decoded lines kept for redraws.
+
+    Args:
+        encoding (string): Encoding of the file.
+
+    """
+
+    INDEX_CHUNK = 4 * 1024 * 1024
+    CACHE_LINES = 4096
+
+    def __init__(self, encoding, parent=None):
+        super(LogFileModel, self).__init__(parent)
+        self._encoding = encoding
+
+        self.path = None
+        self._inode = None
+
+        # Start offset of every line plus the end of the last complete line
+        self._offsets = array('q', [0])
+
+        # row -> text of the rows drawn so far, the indexed lines never change
+        self._lines = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._offsets) - 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+
+        return self.line(index.row())
+
+    def line(self, row):
+        # Return the text of the given row
+        #
+        text = self._lines.get(row)
+
+        if text is None:
+            start = self._offsets[row]
+
+            try:
+                with open(self.path, 'rb') as log:
+                    log.seek(start)
+                    data = log.read(self._offsets[row + 1] - start)
+            except (IOError, OSError):
+                # The log is being rotated, the next poll() resets the rows
+                return ''
+
+            if len(self._lines) >= self.CACHE_LINES:
+                self._lines.clear()
+
+            text = data.decode(self._encoding, 'ignore').rstrip('\r\n')
+            self._lines[row] = text
+
+        return text
+
+    def offset(self, row):
+        # Return the file offset of the given row
+        #
+        return self._offsets[row]
+
+    def row_of(self, offset):
+        # Return the row that holds the given file offset
+        #
+        return max(bisect_right(self._offsets, offset) - 1, 0)
+
+    @property
+    def indexed(self):
+        # Number of bytes indexed so far
+        return self._offsets[-1]
+
+    def open(self, path):
+        # Show the given file, the rows come with the next poll() calls
+        #
+        self.beginResetModel()
+        self._reset()
+        self.path = path
+        self.endResetModel()
+
+    def close(self):
+        self.beginResetModel()
+        self._reset()
+        self.path = None
+        self.endResetModel()
+
+    def poll(self):
+        """Index the lines appended to the file since the last call.
+
+        Ret:
+            True if there is more data to index, else False.
+
+        """
+        if self.path is None:
+            return False
+
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            # The log is being rotated
+            return False
+
+        if self._inode is None:
+            self._inode = stat.st_ino
+        elif stat.st_ino != self._inode or stat.st_size < self.indexed:
+            self.open(self.path)
+            self._inode = stat.st_ino
+
+        if stat.st_size <= self.indexed:
+            return False
+
+        try:
+            with open(self.path, 'rb') as log:
+                size = os.fstat(log.fileno()).st_size
+
+                with mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return self._index(data, size)
+        except (IOError, OSError, ValueError):
+            # Rotated or emptied since the stat() above
+            return False
+
+    def _index(self, data, size):
+        # Index one chunk of the mapped file, see poll()
+        #
+        end = min(size, self.indexed + self.INDEX_CHUNK)
+        ends = array('q', (match.end() for match in _NEWLINE.finditer(data, self.indexed, end)))
+
+        if not ends:
+            # A line longer than INDEX_CHUNK
+            newline = data.find(b'\n', end)
+
+            if newline == -1:
+                # It is not finished yet, nothing more to index
+                return False
+
+            ends.append(newline + 1)
+
+        first = self.rowCount()
+        self.beginInsertRows(QModelIndex(), first, first + len(ends) - 1)
+        self._offsets.extend(ends)
+        self.endInsertRows()
+
+        # More if the chunk did not reach the end of the file, the
+        # unfinished last line waits for its line end
+        return max(end, self.indexed) < size
+
+    def _reset(self):
+        self._inode = None
+        self._offsets = array('q', [0])
+        self._lines = {}
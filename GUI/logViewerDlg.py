@@ -1,9 +1,29 @@
 from PyQt5 import QtCore
 from PyQt5.QtWidgets import *
 from UI.logViewerDlg import Ui_Dialog
+from GUI.LogFileModel import LogFileModel, find_in_file
+from Threads.utility_helper import get_encoding
+from threading import Thread
 import os.path
 
 class logViewerDlg( QDialog ):
+    """ Log viewer dialog.
+
+    load() shows a log file through a LogFileModel: only the visible lines
+    are read, the view follows the end of the file while it is scrolled to
+    the bottom and the search box finds the next match on a background
+    thread. load_records() & the Browser button show plain text instead.
+
+    Attributes:
+        POLL_INTERVAL (int): Milliseconds between two checks for new lines.
+
+    """
+
+    POLL_INTERVAL = 500
+
+    # (search id, file offset of the match or -1)
+    search_done = QtCore.pyqtSignal(int, int)
+
     def __init__(self, parent=None):
         super( logViewerDlg, self ).__init__(parent, QtCore.Qt.WindowType.WindowSystemMenuHint |
         QtCore.Qt.WindowType.WindowTitleHint)
@@ -13,9 +33,29 @@ class logViewerDlg( QDialog ):
 
         self.download = False
 
+        self._encoding = get_encoding()
+        self._log_model = LogFileModel(self._encoding, self)
+        self.ui.LogView.setModel(self._log_model)
+
+        # The model reopens a rotated or cleared file by itself, the
+        # offsets of a search started before do not fit the new rows
+        self._log_model.modelReset.connect(self._drop_searches)
+
+        self._poll_timer = QtCore.QTimer(self)
+        self._poll_timer.setSingleShot(True)
+        self._poll_timer.timeout.connect(self._on_poll)
+
+        # Id of the last search, the results of older ones are dropped
+        self._search_id = 0
+        self.search_done.connect(self._on_search_done)
+
+        self._show_file(False)
+
         self.ui.BrowserBtn.clicked.connect(self.browser_clicked)
         self.ui.CloseBtn.clicked.connect(self.close)
         self.ui.AddBtn.clicked.connect(self.add_clicked)
+        self.ui.SearchEdit.textChanged.connect(lambda text: self._search(False))
+        self.ui.SearchEdit.returnPressed.connect(lambda: self._search(True))
 
     def browser_clicked(self):
         file_name, _ = QFileDialog.getOpenFileName(
@@ -24,7 +64,9 @@ class logViewerDlg( QDialog ):
 
         if file_name == '': 
             return
-            
+
+        self._show_file(False)
+
         with open( file_name, 'r' ) as file_data:
             for line in file_data.readlines():
                 self.ui.UrlsList.append(line.strip())
@@ -40,7 +82,88 @@ class logViewerDlg( QDialog ):
     def load(self, log_file):
         if not os.path.exists(log_file):
             QMessageBox.information(self, 'Error!', 'File not found!!!')
+            return
 
-        with open( log_file, 'r' ) as file_data:
-            for line in file_data.readlines():
-                self.ui.UrlsList.append(line.strip())
\ No newline at end of file
+        self._show_file(True)
+        self._log_model.open(log_file)
+        self._on_poll()
+
+    def load_records(self, lines):
+        # Show the given log lines (e.g. LogManager.records_for())
+        #
+        self._show_file(False)
+
+        for line in lines:
+            self.ui.UrlsList.append(line.strip())
+
+    def closeEvent(self, event):
+        self._poll_timer.stop()
+        self._search_id += 1
+        self._log_model.close()
+        super(logViewerDlg, self).closeEvent(event)
+
+    def _show_file(self, show):
+        # Switch between the log file view and the plain text view
+        #
+        self.ui.LogView.setVisible(show)
+        self.ui.SearchEdit.setVisible(show)
+        self.ui.UrlsList.setVisible(not show)
+
+        if not show:
+            self._poll_timer.stop()
+
+    def _on_poll(self):
+        # Index the new lines, scroll down if the view was at the bottom
+        #
+        scrollbar = self.ui.LogView.verticalScrollBar()
+        follow = scrollbar.value() == scrollbar.maximum()
+
+        more = self._log_model.poll()
+
+        if follow:
+            self.ui.LogView.scrollToBottom()
+
+        # Index the rest of a big file as fast as the GUI allows
+        self._poll_timer.start(0 if more else self.POLL_INTERVAL)
+
+    def _search(self, next_match):
+        # Search the text on a background thread from the current line
+        # (the next one on return)
+        #
+        pattern = self.ui.SearchEdit.text().encode(self._encoding, 'ignore')
+        self._search_id += 1
+
+        if not pattern or self._log_model.path is None:
+            return
+
+        row = self.ui.LogView.currentIndex().row()
+
+        if row < 0:
+            start = 0
+        elif next_match and row + 1 < self._log_model.rowCount():
+            start = self._log_model.offset(row + 1)
+        else:
+            start = self._log_model.offset(row)
+
+        args = (self._search_id, self._log_model.path, pattern, start, self._log_model.indexed)
+        Thread(target=self._search_thread, args=args, daemon=True).start()
+
+    def _search_thread(self, search_id, path, pattern, start, end):
+        try:
+            offset = find_in_file(path, pattern, start, end)
+        except (IOError, OSError, ValueError):
+            offset = -1
+
+        # Queued to the GUI thread
+        self.search_done.emit(search_id, offset)
+
+    def _drop_searches(self):
+        self._search_id += 1
+
+    def _on_search_done(self, search_id, offset):
+        if search_id != self._search_id or offset < 0:
+            return
+
+        index = self._log_model.index(self._log_model.row_of(offset))
+        self.ui.LogView.setCurrentIndex(index)
+        self.ui.LogView.scrollTo(index, QAbstractItemView.PositionAtCenter)
\ No newline at end of file
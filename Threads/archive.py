@@ -0,0 +1,83 @@
+# This Python file uses the following encoding: utf-8
+""" YoutubeDlg module for the youtube-dl download archive.
+
+The archive is the file youtube-dl keeps with the --download-archive
+switch, one '<extractor> <video id>' line per downloaded video.
+youtube-dl appends to it after every completed download, DownloadArchive
+only reads it so the download managers can complete the items of the
+known videos (see canonical.video_key()) before starting youtube-dl.
+
+"""
+
+import os
+
+from threading import Lock
+
+from .canonical import archive_entry
+
+
+class DownloadArchive(object):
+    """
+    Read only, thread safe view of a youtube-dl download archive file.
+
+    The file is read once and then only the lines youtube-dl appended
+    since the last lookup are read, a file that got shorter is read again.
+
+    Args:
+        path (string): Absolute path of the archive file, it does not
+            have to exist.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        self._lock = Lock()
+        self._entries = set()
+        self._offset = 0
+
+    def __contains__(self, url):
+        # True if the video of the url is in the archive
+        #
+        entry = archive_entry(url)
+
+        if entry is None:
+            return False
+
+        with self._lock:
+            self._refresh()
+            return entry in self._entries
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    def _refresh(self):
+        # Read the complete lines appended since the last call
+        #
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+
+        if size < self._offset:
+            self._entries.clear()
+            self._offset = 0
+
+        if size == self._offset:
+            return
+
+        with open(self.path, 'rb') as archive:
+            archive.seek(self._offset)
+            data = archive.read(size - self._offset)
+
+        # Leave an unfinished last line for the next call
+        end = data.rfind(b'\n') + 1
+        self._offset += end
+
+        for line in data[:end].decode('utf-8', 'ignore').splitlines():
+            line = line.strip()
+
+            if line:
+                self._entries.add(line)
@@ -0,0 +1,458 @@
+# This Python file uses the following encoding: utf-8
+""" YoutubeDlg module for managing the download process on one event loop.
+
+AsyncDownloadManager is a drop-in alternative of the thread based
+downloadmanager.DownloadManager. Every youtube-dl process is started with
+asyncio.create_subprocess_exec and its stdout/stderr are read as async
+streams, so all the items run on a single event loop thread instead of
+a Worker thread plus a PipeReader thread per download.
+
+Notes:
+    The number of concurrent downloads is the 'workers_number' option.
+    The messages sent to the GUI are the same as the ones of the
+    DownloadManager & Worker threads (MANAGER_PUB_TOPIC, WORKER_PUB_TOPIC).
+
+"""
+
+import os
+import sys
+import time
+import signal
+import asyncio
+import subprocess
+
+from threading import (
+    Thread,
+    Lock,
+)
+
+from pubsub import pub as Publisher
+
+from Threads.utility_helper import (
+    YOUTUBEDL_BIN,
+    get_encoding,
+)
+
+from Threads.downloader import (
+    BaseDownloader,
+    extract_data,
+    filter_stdout,
+    get_command,
+)
+
+from Threads.playlist import (
+    expand_playlist,
+    is_playlist_url,
+)
+
+from Threads.scheduler import (
+    BandwidthLimiter,
+    saturated_hosts,
+)
+
+from Threads.archive import (
+    DownloadArchive,
+)
+
+from Threads.infocache import (
+    InfoCache,
+)
+
+from Threads.downloadmanager import (
+    MANAGER_PUB_TOPIC,
+    WORKER_PUB_TOPIC,
+    complete_archived,
+    expands_in_process,
+)
+
+
+class AsyncDownloader(BaseDownloader):
+    """
+    Download one url with a youtube-dl process driven by asyncio.
+
+    Same return codes & callbacks as downloader.YoutubeDLDownloader, but
+    download() is a coroutine.
+
+    Attributes:
+        STREAM_LIMIT (int): Buffer limit (bytes) of the stdout/stderr streams.
+
+        READ_SIZE (int): Max number of bytes read from a stream at once.
+
+    Args:
+        youtubedl_path (string): Absolute path to youtube-dl binary.
+
+        data_hook (function): Optional callback function to retrieve download
+            process data.
+
+        log_data (function): Optional callback function to write data to
+            the log file.
+
+    """
+
+    STREAM_LIMIT = 1024 * 1024
+    READ_SIZE = 65536
+
+    def __init__(self, youtubedl_path, data_hook=None, log_data=None):
+        super(AsyncDownloader, self).__init__(data_hook, log_data)
+        self.youtubedl_path = youtubedl_path
+
+        self._encoding = get_encoding()
+        self._proc = None
+        self._stopped = False
+
+    async def download(self, url, options):
+        """Download url using given options.
+
+        See downloader.YoutubeDLDownloader.download() for the return codes.
+        """
+        self._ret_code = self.OK
+        self._reset_stderr()
+
+        cmd = get_command(self.youtubedl_path, url, options)
+
+        kwargs = {}
+        if os.name == 'nt':
+            # Hide subprocess window
+            info = subprocess.STARTUPINFO()
+            info.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            kwargs['startupinfo'] = info
+        else:
+            # Make subprocess the process group leader
+            # in order to kill the whole process group with os.killpg
+            kwargs['start_new_session'] = True
+
+        self._proc = await asyncio.create_subprocess_exec(*cmd,
+                                                          stdout=asyncio.subprocess.PIPE,
+                                                          stderr=asyncio.subprocess.PIPE,
+                                                          limit=self.STREAM_LIMIT,
+                                                          **kwargs)
+
+        if self._stopped:
+            # stop() was called while the process was starting
+            self.stop()
+
+        try:
+            await asyncio.gather(self._read_stdout(), self._read_stderr())
+            await self._proc.wait()
+        except BaseException:
+            # Never leave youtube-dl running without its readers
+            self._kill()
+            raise
+
+        self._last_data_hook()
+
+        return self._ret_code
+
+    def stop(self):
+        # Stop the download process and set return code to stopped
+        #
+        self._stopped = True
+
+        if self._kill():
+            self._set_retcode(self.STOPPED)
+
+    def _kill(self):
+        # Kill the youtube-dl process group, return True if it was running
+        #
+        if self._proc is None or self._proc.returncode is not None:
+            return False
+
+        if os.name == 'nt':
+            self._proc.kill()
+        else:
+            try:
+                os.killpg(self._proc.pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+        return True
+
+    async def _lines(self, stream, filter_lines=None):
+        # Yield the non empty lines (bytes) of the stream. Like the
+        # reactor.PipeReactor the stream is read in chunks & split on
+        # both '\r' & '\n', a long run of '\r' progress lines would
+        # overrun the STREAM_LIMIT of a line based read
+        #
+        partial = b''
+
+        while True:
+            chunk = await stream.read(self.READ_SIZE)
+
+            if chunk:
+                lines = (partial + chunk).replace(b'\r', b'\n').split(b'\n')
+                partial = lines.pop()
+            else:
+                lines, partial = [partial], b''
+
+            if filter_lines is not None:
+                lines = filter_lines(lines)
+
+            for line in lines:
+                if line:
+                    yield line
+
+            if not chunk:
+                break
+
+    async def _read_stdout(self):
+        async for line in self._lines(self._proc.stdout, filter_stdout):
+            stdout = line.decode(self._encoding, 'ignore').rstrip()
+
+            if stdout:
+                self._hook_data(extract_data(stdout))
+
+    async def _read_stderr(self):
+        # Same filtering as downloader.PipeReader: ignore everything
+        # after the ffmpeg banner
+        ignore_line = False
+
+        async for line in self._lines(self._proc.stderr):
+            stderr = line.decode(self._encoding, 'ignore').rstrip()
+
+            if 'ffmpeg version' in stderr:
+                ignore_line = True
+
+            if ignore_line or not stderr:
+                continue
+
+            self._on_stderr(stderr)
+
+
+class AsyncDownloadManager(Thread):
+    """ Manages the download process on a single asyncio event loop.
+
+    Args:
+        See downloadmanager.DownloadManager.
+
+    """
+
+    def __init__(self, parent, download_list, opt_manager, log_manager=None):
+        super(AsyncDownloadManager, self).__init__()
+        self.parent = parent
+        self.download_list = download_list
+        self.opt_manager = opt_manager
+        self.log_manager = log_manager
+
+        self._time_it_took = 0
+        self._successful = 0
+        self._running = True
+
+        self._max_active = opt_manager.options['workers_number']
+        self._expand_playlists = opt_manager.options['expand_playlists']
+        self._expand_in_process = expands_in_process(opt_manager)
+        self._log_lock = Lock()
+
+        # Per-host download cap & bandwidth share of every youtube-dl process
+        self._max_per_host = opt_manager.options['max_per_host']
+        self._rate_options = BandwidthLimiter(opt_manager.options['bandwidth_limit'],
+                                              self._max_active).rate_options()
+
+        # Videos youtube-dl already downloaded, see downloadmanager.DownloadManager
+        self._archive = None
+        if opt_manager.options['download_archive']:
+            self._archive = DownloadArchive(opt_manager.options['download_archive'])
+
+        # Video info youtube-dl extracted, see downloadmanager.Worker
+        self._info_cache = None
+        if opt_manager.options['info_cache_ttl']:
+            self._info_cache = InfoCache(os.path.join(opt_manager.config_path, 'info_cache'),
+                                         opt_manager.options['info_cache_ttl'],
+                                         opt_manager.options['info_cache_size'])
+
+        # Created on the event loop thread, see _main()
+        self._loop = None
+        self._wakeup = None
+
+        # object_id -> (AsyncDownloader, asyncio.Task)
+        self._downloads = {}
+
+        # object_id -> host of the running downloads
+        self._hosts = {}
+
+        self.start()
+
+    @property
+    def successful(self):
+        # Return number of successful downloads
+        return self._successful
+
+    @property
+    def time_it_took(self):
+        """Returns time(seconds) it took for the download process
+        to complete. """
+        return self._time_it_took
+
+    def run(self):
+        self._time_it_took = time.time()
+
+        if os.name == 'nt' and sys.version_info < (3, 8):
+            # Subprocesses need the proactor loop on older pythons
+            asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
+        asyncio.run(self._main())
+
+        self._time_it_took = time.time() - self._time_it_took
+
+        if not self._running:
+            self._talk_to_gui('closed')
+        else:
+            self._talk_to_gui('finished')
+
+    def active(self):
+        """ Return number of active items:
+        Notes:
+            active_items = (running downloads) + (items waiting in the download_list)
+
+        """
+        return len(self.download_list)
+
+    def stop_downloads(self):
+        """Stop the download process. Also send 'closing'
+        signal to the GUI.
+        """
+        self._talk_to_gui('closing')
+        self._running = False
+        self._wake_up()
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+
+        self.download_list.add_listener(self._wake_up)
+
+        try:
+            while self._running:
+                self._wakeup.clear()
+
+                while self._running and len(self._downloads) < self._max_active:
+                    hosts = saturated_hosts(self._hosts.values(), self._max_per_host)
+                    item = self.download_list.fetch_next(hosts)
+
+                    if item is None:
+                        break
+
+                    if complete_archived(self.download_list, self._archive, item):
+                        self._successful += 1
+                        continue
+
+                    self._start(item)
+
+                if not self._downloads and self.download_list.fetch_next() is None:
+                    break
+
+                await self._wakeup.wait()
+
+            for downloader, _ in self._downloads.values():
+                downloader.stop()
+
+            tasks = [task for _, task in self._downloads.values()]
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self.download_list.remove_listener(self._wake_up)
+
+    def _start(self, item):
+        object_id = item.object_id
+
+        # Info files youtube-dl wrote, see _download()
+        info_files = []
+
+        def data_hook(data):
+            if 'info_json' in data:
+                info_files.append(data['info_json'])
+
+            self._talk_to_worker_topic(object_id, data)
+
+        def log_data(data):
+            self._log_data(data, object_id, item.url)
+
+        downloader = AsyncDownloader(self._youtubedl_path(), data_hook, log_data)
+
+        self.download_list.change_stage(object_id, 'Active')
+
+        expand = (self._expand_playlists and item.parent_id is None and is_playlist_url(item.url))
+        options = item.options + self._rate_options
+
+        task = self._loop.create_task(self._download(object_id, downloader, item.url,
+                                                     options, expand, info_files))
+        self._downloads[object_id] = (downloader, task)
+        self._hosts[object_id] = item.host
+
+    async def _download(self, object_id, downloader, url, options, expand, info_files):
+        try:
+            if expand and await self._expand_playlist(object_id, url, options):
+                return
+
+            # Only the info of a single video can replace the extraction,
+            # see InfoCache.accepts()
+            use_cache = self._info_cache is not None and self._info_cache.accepts(url)
+
+            if use_cache:
+                cache_options, cached = self._info_cache.prepare(url, options)
+                ret_code = await downloader.download(url, cache_options)
+            else:
+                ret_code = await downloader.download(url, options)
+
+            success = ret_code in (AsyncDownloader.OK, AsyncDownloader.ALREADY, AsyncDownloader.WARNING)
+
+            if use_cache:
+                self._info_cache.finish(url, options, cached, info_files, success)
+
+            if success:
+                self._successful += 1
+        except Exception as error:
+            # youtube-dl could not be started or its output not read,
+            # download() already killed it
+            downloader.stop()
+            self._log_data('ERROR: {0}'.format(error), object_id)
+            self._talk_to_worker_topic(object_id, {'status': 'Error'})
+        finally:
+            del self._downloads[object_id]
+            del self._hosts[object_id]
+            self._wakeup.set()
+
+    async def _expand_playlist(self, object_id, url, options):
+        # Return True if the playlist was expanded, see downloadmanager.Worker
+        #
+        urls = await self._loop.run_in_executor(None, expand_playlist,
+                                                self._youtubedl_path(), url, options,
+                                                self._expand_in_process)
+
+        if urls is None:
+            return False
+
+        data = {'index': object_id, 'urls': urls}
+        Publisher.sendMessage(WORKER_PUB_TOPIC, data=('expand', data))
+
+        self._talk_to_worker_topic(object_id, {'status': 'Expanded', 'playlist_size': str(len(urls))})
+        return True
+
+    def _wake_up(self):
+        # Thread safe way to wake up the _main() loop
+        #
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _log_data(self, data, object_id=None, url=None):
+        if self.log_manager is not None:
+            with self._log_lock:
+                self.log_manager.log_record(data, object_id, url)
+
+    def _talk_to_worker_topic(self, object_id, data):
+        # Send a Worker style ('send', data) message to the GUI
+        #
+        data['index'] = object_id
+        Publisher.sendMessage(WORKER_PUB_TOPIC, data=('send', data))
+
+    def _talk_to_gui(self, data):
+        """ Send data back to the GUI
+
+        See downloadmanager.DownloadManager._talk_to_gui()
+        """
+        Publisher.sendMessage(MANAGER_PUB_TOPIC, data=data)
+
+    def _youtubedl_path(self):
+        # Return the youtube-dl binary path
+        #
+        path = self.opt_manager.options['youtubedl_path']
+        path = os.path.join(path, YOUTUBEDL_BIN)
+        return path
@@ -0,0 +1,193 @@
+# This Python file uses the following encoding: utf-8
+""" YoutubeDlg module for recognizing the video of a url without youtube-dl.
+
+video_key() maps the url shapes of a few well known sites to the
+(extractor, video id) pair youtube-dl uses, e.g. in the lines of its
+--download-archive file ('youtube dQw4w9WgXcQ'). Urls of other sites,
+playlists & channels (including a video url with a list, see
+playlist.is_playlist_url()) return None and are left to youtube-dl.
+
+canonical_url() builds on it to give all the urls of the same video one
+spelling, item_id() turns that into a DownloadItem object_id that is the
+same in every run.
+
+Attributes:
+    YOUTUBE_HOSTS (tuple): Hosts (see scheduler.host_of()) of the
+        youtube extractor.
+
+    CANONICAL_URLS (dict): Url template of the video pages by extractor.
+
+"""
+
+import re
+import hashlib
+
+from urllib.parse import (
+    urlparse,
+    urlsplit,
+    urlunsplit,
+    parse_qs,
+)
+
+from .scheduler import host_of
+from .playlist import is_playlist_url
+
+YOUTUBE_HOSTS = ('youtube.com', 'youtube-nocookie.com')
+
+CANONICAL_URLS = {
+    'youtube': 'https://www.youtube.com/watch?v={0}',
+    'vimeo': 'https://vimeo.com/{0}',
+    'dailymotion': 'https://www.dailymotion.com/video/{0}',
+}
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+_YOUTUBE_ID = re.compile(r'^[0-9A-Za-z_-]{11}$')
+
+# Paths of the youtube video pages besides /watch?v=<id>
+_YOUTUBE_PATH = re.compile(r'^/(?:shorts|embed|v|live|e)/([0-9A-Za-z_-]{11})(?:[/?#]|$)')
+
+_VIMEO_PATH = re.compile(r'^/(?:video/)?(\d+)(?:[/?#]|$)')
+
+_DAILYMOTION_PATH = re.compile(r'^/(?:video/)?([0-9A-Za-z]+)')
+
+
+def video_key(url):
+    """Return the (extractor, video id) of the given url.
+
+    Example:
+        'https://youtu.be/dQw4w9WgXcQ?t=10' -> ('youtube', 'dQw4w9WgXcQ')
+        'https://vimeo.com/76979871' -> ('vimeo', '76979871')
+
+    Ret:
+        Tuple of strings or None if the url is not a known video url.
+
+    """
+    # 'watch?v=<id>&list=<id>' downloads the whole list, not the video
+    if is_playlist_url(url.strip()):
+        return None
+
+    return _video_key(url)
+
+
+def _video_key(url):
+    # video_key() without the playlist check
+    #
+    try:
+        parsed = urlparse(url.strip())
+    except ValueError:
+        return None
+
+    host = host_of(url.strip())
+    path = parsed.path
+
+    if host in YOUTUBE_HOSTS:
+        return _youtube_key(parsed)
+
+    if host in ('vimeo.com', 'player.vimeo.com'):
+        match = _VIMEO_PATH.match(path)
+        return ('vimeo', match.group(1)) if match else None
+
+    if host == 'dai.ly' or (host == 'dailymotion.com' and path.startswith('/video/')):
+        match = _DAILYMOTION_PATH.match(path)
+        return ('dailymotion', match.group(1).split('_')[0]) if match else None
+
+    return None
+
+
+def archive_entry(url):
+    """Return the --download-archive line (without the line end) of the
+    given url or None, see video_key(). """
+    key = video_key(url)
+
+    if key is None:
+        return None
+
+    return '{0} {1}'.format(*key)
+
+
+def canonical_url(url):
+    """Return one spelling of the url for all the urls of the same page.
+
+    The urls of a known video become its CANONICAL_URLS url, plus the
+    list parameter of a youtube video in a playlist, the others only lose
+    what can not change the page: surrounding whitespace, the case of the
+    scheme & host, the default port and the fragment.
+
+    Example:
+        'https://youtu.be/dQw4w9WgXcQ?t=10' ->
+            'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+        'https://youtu.be/dQw4w9WgXcQ?list=PL0' ->
+            'https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL0'
+        'HTTPS://Example.com:443/a#top' -> 'https://example.com/a'
+
+    """
+    url = url.strip()
+    key = _video_key(url)
+
+    if key is not None:
+        canonical = CANONICAL_URLS[key[0]].format(key[1])
+
+        # The playlist is a different download than its video
+        playlists = parse_qs(urlsplit(url).query).get('list', [])
+
+        if key[0] == 'youtube' and playlists:
+            canonical += '&list=' + playlists[0]
+
+        return canonical
+
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or '').lower()
+
+    if ':' in netloc:
+        # IPv6 address
+        netloc = '[{0}]'.format(netloc)
+
+    if port is not None and port != _DEFAULT_PORTS.get(scheme):
+        netloc = '{0}:{1}'.format(netloc, port)
+
+    if parts.username is not None:
+        netloc = '{0}@{1}'.format(parts.netloc.rpartition('@')[0], netloc)
+
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+
+def item_id(url, options):
+    """Return the object_id of the download item of url & options.
+
+    The id is taken from the sha1 digest of the canonical url and the
+    options, so it is the same for equivalent urls and in every run
+    (unlike hash() of a string).
+
+    Ret:
+        Non negative int (64 bits).
+
+    """
+    identity = '\0'.join((canonical_url(url),) + tuple(options))
+    digest = hashlib.sha1(identity.encode('utf-8')).digest()
+
+    return int.from_bytes(digest[:8], 'big')
+
+
+def _youtube_key(parsed):
+    if parsed.path == '/watch':
+        video_ids = parse_qs(parsed.query).get('v', [])
+
+        if video_ids and _YOUTUBE_ID.match(video_ids[0]):
+            return ('youtube', video_ids[0])
+
+        return None
+
+    # youtu.be is an alias of youtube.com in scheduler.HOST_ALIASES
+    if parsed.hostname.lower() == 'youtu.be':
+        video_id = parsed.path.strip('/')
+        return ('youtube', video_id) if _YOUTUBE_ID.match(video_id) else None
+
+    match = _YOUTUBE_PATH.match(parsed.path)
+    return ('youtube', match.group(1)) if match else None
@@ -27,45 +27,50 @@ import os
 import json
 
 from os import pipe
-import queue
 import sys
 import signal
 import subprocess
 
+from collections import deque
+
 from threading import (
     Thread,
+    Event,
 )
 
 from .utility_helper import (
     get_encoding,
 )
 
-#+++++<DEBUG_LOG>
+from .reactor import get_reactor
+
+# Configured once by main.setup_logging()
 import logging
-format = "%(asctime)s: %(message)s"
-logging.basicConfig(format=format, level=logging.INFO, datefmt='%H:%M:%S')
-logging.getLogger().setLevel(logging.DEBUG)
-#-----<DEBUG_LOG>
 
 class PipeReader(Thread):
     """ Helper class to avoid deadlocks when reading from subprocess pipes
 
-    This class uses python threads and message queues in order to read from subprocess
+    This class uses python threads in order to read from subprocess
 
     Attributes:
         WAIT_TIME (float): Time in seconds to sleep
 
     Args:
-        queue (queue.Queue): Python queue to store the output of the subprocess    
+        on_line (function): Called on the PipeReader thread with every line
+            of the subprocess output as soon as it is read
     """
 
     WAIT_TIME = 0.1
 
-    def __init__(self, queue):
+    def __init__(self, on_line):
         super(PipeReader, self).__init__()
         self._filedescriptor = None
         self._running = True
-        self._queue = queue
+        self._on_line = on_line
+
+        # Set once the attached filedescriptor reached EOF
+        self._drained = Event()
+        self._drained.set()
 
         self.start()
 
@@ -82,29 +87,40 @@ class PipeReader(Thread):
                         ignore_line = True
 
                     if not ignore_line:
-                        self._queue.put_nowait(line)
+                        self._on_line(line)
                         #+++++<DEBUG_LOG>
                         #logging.debug("_filedescriptor=%s", line)
                         #-----<DEBUG_LOG>    
 
                 self._filedescriptor = None
                 ignore_line = False
+                self._drained.set()
 
             time.sleep(self.WAIT_TIME)
 
     def attach_filedescriptor(self, filedesc):
         # Attach a filedescriptor to the PipeReader
         #
+        self._drained.clear()
         self._filedescriptor = filedesc
 
+    def wait_drained(self, timeout=None):
+        # Block until every line of the attached filedescriptor was passed
+        # to on_line. Returns False on timeout
+        #
+        return self._drained.wait(timeout)
+
     def join(self, timeout=None):
         self._running = False
         super(PipeReader, self).join(timeout)
 
 
-class YoutubeDLDownloader(object):
+class BaseDownloader(object):
     """
-    Python class for downloading videos using youtube-dl and processing
+    Return codes & callbacks shared by the youtube-dl download engines.
+
+    Every engine implements download(url, options), stop() and close()
+    and reports through data_hook the same dicts extract_data() returns.
 
     Attributes:
         OK, ERROR, STOPPED, ALREADY, FILISIZE_ABORT, WARNING (int): Integers
@@ -113,6 +129,122 @@ class YoutubeDLDownloader(object):
             Codes with smaller hierarchy cannot overwrite codes with higher
             hierarchy.
 
+        STDERR_LINES (int): Number of stderr lines kept in stderr_tail.
+
+        stderr_tail (collections.deque): Last STDERR_LINES stderr lines of
+            the current download.
+
+        warnings, errors (int): Number of warning & error lines of the
+            current download.
+
+    Args:
+        data_hook (function): Optional callback function to retrieve download
+            process data.
+
+        log_data (function): Optional callback function to write data to
+            the log file.
+    """
+
+    OK = 0
+    WARNING = 1
+    ERROR = 2
+    FILESIZE_ABORT = 3
+    ALREADY = 4
+    STOPPED = 5
+
+    STDERR_LINES = 100
+
+    def __init__(self, data_hook=None, log_data=None):
+        self.data_hook = data_hook
+        self.log_data = log_data
+
+        self._ret_code = self.OK
+
+        self.stderr_tail = deque(maxlen=self.STDERR_LINES)
+        self.warnings = 0
+        self.errors = 0
+
+    def _reset_stderr(self):
+        # Forget the stderr of the previous download
+        #
+        self.stderr_tail.clear()
+        self.warnings = 0
+        self.errors = 0
+
+    def _on_stderr(self, stderr):
+        # Log & classify a stderr line as soon as it arrives
+        #
+        self.stderr_tail.append(stderr)
+        self._log(stderr)
+
+        if self._is_warning(stderr):
+            self.warnings += 1
+            self._set_retcode(self.WARNING)
+        else:
+            self.errors += 1
+            self._set_retcode(self.ERROR)
+
+    def _is_warning(self, stderr):
+        return stderr.split(':')[0] == 'WARNING'        
+
+    def _set_retcode(self, code):
+        # if the given code is higher than the current self._ret_code
+        #
+        if code >= self._ret_code:
+            self._ret_code = code
+
+    def _log(self, data):
+        # Log data using the callback function
+        #
+        if self.log_data is not None:
+            self.log_data(data)
+            
+    def _hook_data(self, data):
+        # Pass data back to the caller
+        #
+        if self.data_hook is not None:
+            self.data_hook(data)
+
+    def _last_data_hook(self):
+
+        #logging.info("______._last_data_hook()_______")
+
+        """Set the last data info based on the return code
+        """
+        data = {}
+        if self._ret_code == self.OK:
+            data['status'] = 'Finished'
+        elif self._ret_code == self.ERROR:
+            data['status'] = 'Error'
+            data['speed'] = ''
+            data['eta'] = ''
+        elif self._ret_code == self.WARNING:
+            data['status'] = 'Warning'
+            data['speed'] = ''
+            data['eta'] = ''
+        elif self._ret_code == self.STOPPED:
+            data['status'] = 'Stopped'
+            data['speed'] = ''
+            data['eta'] = ''        
+        elif self._ret_code == self.ALREADY:
+            data['status'] = 'Already Downloaded'
+        else:
+            data['status'] = 'Filesize Abort'  
+
+        self._hook_data(data)
+
+
+class YoutubeDLDownloader(BaseDownloader):
+    """
+    Python class for downloading videos using youtube-dl and processing
+
+    Attributes:
+        OK, ERROR, STOPPED, ALREADY, FILISIZE_ABORT, WARNING (int): See
+            BaseDownloader.
+
+        DRAIN_TIMEOUT (float): Time in seconds to wait for the stderr
+            PipeReader after a stop() (Windows only).
+
     Args:
         youtubedl_path (string): Absolute path to youtube-dl binary.
 
@@ -127,6 +259,11 @@ class YoutubeDLDownloader(object):
         finished with the object in order for the object to be able for properly
         close down itself.
 
+    Notes:
+        The stdout & stderr pipes are read by the shared reactor.PipeReactor
+        thread. Where it is not available (Windows) stdout is read by the
+        calling thread and stderr by a PipeReader thread.
+
     Example:
         How to use YoutubeDlDownloader from a python script:
 
@@ -141,25 +278,18 @@ class YoutubeDLDownloader(object):
 
     """
 
-    OK = 0
-    WARNING = 1
-    ERROR = 2
-    FILESIZE_ABORT = 3
-    ALREADY = 4
-    STOPPED = 5
+    DRAIN_TIMEOUT = 1.0
 
     def __init__(self, youtubedl_path, data_hook=None, log_data=None):
+        super(YoutubeDLDownloader, self).__init__(data_hook, log_data)
         self.youtubedl_path = youtubedl_path
-        self.data_hook = data_hook
-        self.log_data = log_data
-
-        self._ret_code = self.OK
         self._proc = None
 
         #self._encoding = get_encoding()
         self._encoding = get_encoding()
-        self._stderr_queue = queue.Queue() #the queue size is infinite.
-        self._stderr_reader = PipeReader(self._stderr_queue)
+
+        self._reactor = get_reactor()
+        self._stderr_reader = PipeReader(self._on_stderr_line) if self._reactor is None else None
 
     def download(self, url, options):
         """Download url using given options.
@@ -184,108 +314,131 @@ class YoutubeDLDownloader(object):
         #logging.info("___YoutubeDLDownloader_________")
 
         self._ret_code = self.OK
+        self._reset_stderr()
 
         cmd = self._get_cmd(url, options)
         self._create_process(cmd)
 
-        self._stderr_reader.attach_filedescriptor(self._proc.stderr)
-
-        while self._proc_is_alive():
-            stdout = self._proc.stdout.readline().rstrip()
-            #stdout = stdout.decode(self._encoding, 'ignore')
-
-            if stdout:
-                data_dict = extract_data(stdout)
-                #self._extract_info(data_dict)
-                self._hook_data(data_dict)
-
-        # Read stderr after download process has been completed
-        # We don't need to read stderr in real time
-        while not self._stderr_queue.empty():
-            
-            #logging.info("not stderr_queue.empty()")  
-
-            stderr = self._stderr_queue.get_nowait().rstrip()
-            #stderr = stderr.decode(self._encoding, 'ignore')
-
-            self._log(stderr)
-
-            if self._is_warning(stderr):
-                self._set_retcode(self.WARNING)
-            else:
-                self._set_retcode(self.ERROR)
+        # The stderr lines are logged & classified while they arrive,
+        # see _on_stderr_line()
+        if self._reactor is None:
+            self._read_pipes()
+        else:
+            self._watch_pipes()
 
         self._last_data_hook()
 
         return self._ret_code
 
-    def _is_warning(self, stderr):
-        return stderr.split(':')[0] == 'WARNING'        
-
     def stop(self):
         # Stop the download process and set return code to stopped
         #
-        if self._proc_is_alive():
-            if os.name == 'nt':
-                # os.killpg is not available on Windows
-                # see https://bugs.python.org/issue5115
-
-                logging.info("___._proc.kill()_______")
-                self._proc.kill()
-            else:
+        if self._kill():
+            self._set_retcode(self.STOPPED)
+
+    def _kill(self):
+        # Kill the download process, return True if it was running
+        #
+        if not self._proc_is_alive():
+            return False
+
+        if os.name == 'nt':
+            # os.killpg is not available on Windows
+            # see https://bugs.python.org/issue5115
+
+            logging.info("___._proc.kill()_______")
+            self._proc.kill()
+        else:
+            try:
                 os.killpg(self._proc.pid, signal.SIGKILL)
+            except OSError:
+                pass
 
-            self._set_retcode(self.STOPPED)
+        return True
 
     def close(self):
-        # Blocks until all items in the queue have been gotten and processed.
-        self._stderr_reader.join()
+        # Stop the PipeReader thread (when the reactor is not used)
+        if self._stderr_reader is not None:
+            self._stderr_reader.join()
 
-    def _set_retcode(self, code):
-        # if the given code is higher than the current self._ret_code
+    def _read_pipes(self):
+        # Read stdout on the calling thread, stderr goes to the PipeReader
         #
-        if code >= self._ret_code:
-            self._ret_code = code
+        self._stderr_reader.attach_filedescriptor(self._proc.stderr)
 
-    def _log(self, data):
-        # Log data using the callback function
-        #
-        if self.log_data is not None:
-            self.log_data(data)
-            
-    def _hook_data(self, data):
-        # Pass data back to the caller
+        while self._proc_is_alive():
+            self._on_stdout_line(self._proc.stdout.readline())
+
+        if self._ret_code == self.STOPPED:
+            # A killed shell may leave youtube-dl holding the pipes
+            self._stderr_reader.wait_drained(self.DRAIN_TIMEOUT)
+            return
+
+        # The last lines may come after the process exit and the late
+        # stderr lines belong to this download, not the next one
+        for stdout in iter(self._proc.stdout.readline, ''):
+            self._on_stdout_line(stdout)
+
+        self._stderr_reader.wait_drained()
+
+    def _on_stdout_line(self, stdout):
+        stdout = stdout.rstrip()
+        #stdout = stdout.decode(self._encoding, 'ignore')
+
+        if stdout:
+            data_dict = extract_data(stdout)
+            #self._extract_info(data_dict)
+            self._hook_data(data_dict)
+
+    def _on_stderr_line(self, stderr):
+        stderr = stderr.rstrip()
+
+        if stderr:
+            self._on_stderr(stderr)
+
+    def _watch_pipes(self):
+        # Let the reactor read both pipes, block until they are closed
         #
-        if self.data_hook is not None:
-            self.data_hook(data)
+        closed = Event()
+        open_pipes = [2]
+        ignore_stderr = [False]
 
-    def _last_data_hook(self):
+        def on_stdout(line):
+            stdout = line.decode(self._encoding, 'ignore').rstrip()
 
-        #logging.info("______._last_data_hook()_______")
+            if stdout:
+                self._hook_data(extract_data(stdout))
 
-        """Set the last data info based on the return code
-        """
-        data = {}
-        if self._ret_code == self.OK:
-            data['status'] = 'Finished'
-        elif self._ret_code == self.ERROR:
-            data['status'] = 'Error'
-            data['speed'] = ''
-            data['eta'] = ''
-        elif self._ret_code == self.WARNING:
-            data['status'] = 'Warning'
-            data['speed'] = ''
-            data['eta'] = ''
-        elif self._ret_code == self.STOPPED:
-            data['status'] = 'Stopped'
-            data['speed'] = ''
-            data['eta'] = ''        
-        elif self._ret_code == self.ALREADY:
-            data['status'] = 'Already Downloaded'
-        else:
-            data['status'] = 'Filesize Abort'  
+        def on_stderr(line):
+            stderr = line.decode(self._encoding, 'ignore')
 
-        self._hook_data(data)
+            # Ignore ffmpeg stderr
+            if 'ffmpeg version' in stderr:
+                ignore_stderr[0] = True
+
+            if not ignore_stderr[0]:
+                self._on_stderr_line(stderr)
+
+        def on_close(error=None):
+            # Both callbacks run on the reactor thread
+            if error is not None:
+                # Nobody reads the pipe, youtube-dl could block on it
+                self._on_stderr('ERROR: {0}'.format(error))
+                self._kill()
+
+            open_pipes[0] -= 1
+
+            if not open_pipes[0]:
+                closed.set()
+
+        self._reactor.register(self._proc.stdout, on_stdout, on_close, filter_stdout)
+        self._reactor.register(self._proc.stderr, on_stderr, on_close)
+
+        closed.wait()
+
+        self._proc.wait()
+        self._proc.stdout.close()
+        self._proc.stderr.close()
 
     def _create_process(self, cmd):
         """Create new process
@@ -309,6 +462,16 @@ class YoutubeDLDownloader(object):
         if sys.version_info < (3, 0):
             cmd = [item.encode(self._encoding, 'ignore') for item in cmd]
 
+        if self._reactor is not None:
+            # The reactor reads raw bytes, the lines are decoded
+            # by the callbacks of _watch_pipes()
+            self._proc = subprocess.Popen(cmd,
+                                          stdout=subprocess.PIPE,
+                                          stderr=subprocess.PIPE,
+                                          preexec_fn=preexec,
+                                          startupinfo=info)
+            return
+
         self._proc = subprocess.Popen(cmd, 
                                       stdout=subprocess.PIPE,
                                       stderr=subprocess.PIPE,
@@ -338,161 +501,240 @@ class YoutubeDLDownloader(object):
 
         """
 
-        if os.name == 'nt':
-            cmd = [self.youtubedl_path] + options + [url]
-        else:
-            cmd = ['python', self.youtubedl_path] + options + [url]
+        cmd = get_command(self.youtubedl_path, url, options)
         
         logging.info("_get_cmd(%s)", cmd)
 
         return cmd
 
 
-def extract_data(stdout):
-    """Extract data from youtube-dl stdout.
+def _is_progress(line):
+    # '[download]  12.5% of 4.30MiB at  2.35MiB/s ETA 00:01' but not the
+    # '[download] 100% of 4.30MiB in 00:01' line (it has a final filesize)
+    return line.startswith(b'[download] ') and b'% of ' in line and b' 100% ' not in line
+
+
+def filter_stdout(lines):
+    """Drop the youtube-dl stdout lines (bytes) no one needs before decoding.
+
+    Lines that extract_data() ignores (not '[...]' or '[debug]') are dropped
+    and a run of progress lines is reduced to its last line, since every
+    progress line overwrites the values of the previous one.
 
     Args:
-        stdout (string): Contains the youtube-dl stdout.
+        lines (list): Lines of a chunk of youtube-dl stdout (bytes).
 
     Ret:
-        python dict: The returned dict can be empty if there are
-        no data to extract eslt it may contrain one of more of the
-        following keys:
+        python list with the lines to parse.
 
-        status: contains the status of the process download.
-        path: destination path
-        extension: the file extension
-        filenme: the file name with out ext
-        percent: the percentage of the video being downloaded.
-        eta: estimate time for the completion of the download process.
-        speed: download speed
-        filesize: the size of the video file being downloaded
-        playlist_index: the playlist index of the current video file being downloaded
-        playlist_size: the number of vides in the playlist
+    """
+    kept = []
 
+    for line in lines:
+        head = line if line[:1] == b'[' else line.lstrip()
 
-    """ 
-    # REFACTOR
-    def extract_filename(input_data):
-        path, fullname = os.path.split(input_data.strip("\""))
-        filename, extension = os.path.splitext(fullname)
+        if head[:1] != b'[' or head.startswith(b'[debug]'):
+            continue
 
-        return path, filename, extension
+        if kept and _is_progress(head) and _is_progress(kept[-1].lstrip()):
+            kept[-1] = line
+        else:
+            kept.append(line)
 
-    data_dictionary = {}
+    return kept
 
-    if not stdout:
-        return data_dictionary
 
-    # We want to keep the spaces in order to extract filenames with
-    # multiple whitespaces correctly. We also keep a copy of the old 
-    # 'std' for backward compatibility with the old code
+def get_command(youtubedl_path, url, options):
+    """Return the youtube-dl command for the given url & options as a list.
+    """
+    if os.name == 'nt':
+        return [youtubedl_path] + list(options) + [url]
+
+    return ['python', youtubedl_path] + list(options) + [url]
+
+
+def _extract_filename(input_data):
+    path, fullname = os.path.split(input_data.strip("\""))
+    filename, extension = os.path.splitext(fullname)
+
+    return path, filename, extension
+
+
+def _set_filename(data_dictionary, input_data):
+    # Store the path, filename & extension of input_data
+    #
+    path, filename, extension = _extract_filename(input_data)
+
+    data_dictionary['path'] = path
+    data_dictionary['filename'] = filename
+    data_dictionary['extension'] = extension
+
+
+def _parse_download(stdout, tokens):
+    # '[download] ...' lines, the progress lines come first since with
+    # '--newline' they are the bulk of the output.
     # Output template example
     # stdout = "[download]   1.9% of 4.30GiB at  1.01MiB/s ETA 01:11:25"
+    #
+    second = tokens[1]
 
-    stdout_with_spaces = stdout.split(' ')
-    stdout = stdout.split()
-
-    #+++++<DEBUG_LOG>
-    logging.debug("%s", stdout)
-    #-----<DEBUG_LOG>
-
-    stdout[0] = stdout[0].lstrip('\r')
-
-    if stdout[0] == '[download]':
-        data_dictionary['status'] = 'Downloading'
-
-        # Get path, filename & ext
-        if stdout[1] == 'Destination:':
-            path, filename, extension = extract_filename(' '.join(stdout_with_spaces[2:]))
-
-            data_dictionary['path'] = path
-            data_dictionary['filename'] = filename
-            data_dictionary['extension'] = extension
-
-        # Get progress info
-        if '%' in  stdout[1]:
-            if stdout[1] == '100%':
-                data_dictionary['status'] = 'Already Downloaded'
-                data_dictionary['filesize'] = stdout[3]
-                data_dictionary['percent'] = '100%'
-                data_dictionary['eta'] = ''
-                data_dictionary['speed'] = ''
-            else:
-                data_dictionary['percent'] = stdout[1]
-                data_dictionary['filesize'] = stdout[3]
-                data_dictionary['speed'] = stdout[5]
-                data_dictionary['eta'] = stdout[7]
-
-        # Get playlist info (if exist)
-        if stdout[1] == 'Downloading' and stdout[2] == 'video':
-            data_dictionary['playlist_index'] = stdout[3]
-            data_dictionary['playlist_size'] = stdout[5]
-
-        # Remove the 'and merged' part from stdout when using ffmpeg to merge the formats
-        if stdout[-3] == 'downloaded' and stdout [-1] == 'merged':
-            stdout = stdout[:-2]
-            stdout_with_spaces = stdout_with_spaces[:-2]
+    data_dictionary = {'status': 'Downloading'}
 
+    # Get progress info
+    if '%' in second:
+        if second == '100%':
+            data_dictionary['status'] = 'Already Downloaded'
+            data_dictionary['filesize'] = tokens[3]
             data_dictionary['percent'] = '100%'
+            data_dictionary['eta'] = ''
+            data_dictionary['speed'] = ''
+        else:
+            data_dictionary['percent'] = second
+            data_dictionary['filesize'] = tokens[3]
+            data_dictionary['speed'] = tokens[5]
+            data_dictionary['eta'] = tokens[7]
+
+    # Get path, filename & ext. The filename is taken from the line split
+    # on single spaces to keep the filenames with multiple whitespaces.
+    elif second == 'Destination:':
+        _set_filename(data_dictionary, ' '.join(stdout.split(' ')[2:]))
+
+    # Get playlist info (if exist)
+    elif second == 'Downloading' and tokens[2] == 'video':
+        data_dictionary['playlist_index'] = tokens[3]
+        data_dictionary['playlist_size'] = tokens[5]
+
+    last = tokens[-1]
+
+    # Remove the 'and merged' part when using ffmpeg to merge the formats
+    if last == 'merged' and tokens[-3] == 'downloaded':
+        data_dictionary['percent'] = '100%'
+        data_dictionary['status'] = 'Already Downloaded'
+        _set_filename(data_dictionary, ' '.join(stdout.split(' ')[1:-6]))
+
+    # Get file already downloaded status
+    elif last == 'downloaded':
+        data_dictionary['status'] = 'Already Downloaded'
+        _set_filename(data_dictionary, ' '.join(stdout.split(' ')[1:-4]))
+
+    # Get filesize abort status
+    elif last == 'Aborting.':
+        data_dictionary['status'] = 'Filesize Abort'
+
+    return data_dictionary
+
+
+def _parse_hlsnative(stdout, tokens):
+    # native hls extractor
+    # see: https://github.com/rg3/youtube-dl/blob/master/youtube_dl/downloader/hls.py#L54
+    #
+    data_dictionary = {'status': 'Downloading'}
+
+    if len(tokens) == 7:
+        segment_no = float(tokens[6])
+        current_segment = float(tokens[4])
+
+        # Get the percentage
+        percent = '{0:.1f}%'.format(current_segment / segment_no * 100)
+        data_dictionary['percent'] = percent
+
+    return data_dictionary
 
-        # Get file already downloaded status
-        if stdout[-1] == 'downloaded':
-            data_dictionary['status'] = 'Already Downloaded'
-            path, filename, extension = extract_filename(' '.join(stdout_with_spaces[1:-4]))
 
-            data_dictionary['path'] = path
-            data_dictionary['filename'] = filename
-            data_dictionary['extension'] = extension
+# Second token of the '[ffmpeg]' lines that carry the final filename
+# mapped to the position of the filename in the line split on single spaces
+_FFMPEG_FILENAME_START = {
+    'Merging': 4,       # Final extension after merging process
+    'Destination:': 2,  # Final extension of a simple post process
+    'Converting': 8,    # Final extension after recoding process
+}
 
-        # Get filesize abort status
-        if stdout[-1] == 'Aborting.':
-            data_dictionary['status'] = 'Filesize Abort'
 
-    elif stdout[0] == '[hlsnative]':
-        # native hls extractor
-        # see: https://github.com/rg3/youtube-dl/blob/master/youtube_dl/downloader/hls.py#L54
-        data_dictionary['status'] = 'Downloading'
+def _parse_ffmpeg(stdout, tokens):
+    data_dictionary = {'status': 'Post Processing'}
 
-        if len(stdout) == 7:
-            segment_no = float(stdout[6])
-            current_segment = float(stdout[4])
+    start = _FFMPEG_FILENAME_START.get(tokens[1])
 
-            # Get the percentage
-            percent = '{0:.1f}%'.format(current_segment / segment_no * 100)
-            data_dictionary['percent'] = percent
+    if start is not None:
+        _set_filename(data_dictionary, ' '.join(stdout.split(' ')[start:]))
 
-    elif stdout[0] == '[ffmpeg]':
-        data_dictionary['status'] = 'Post Processing'
+    return data_dictionary
 
-        # Get final extension after merging process
-        if stdout[1] == 'Merging':
-            path, filename, extension = extract_filename(' '.join(stdout_with_spaces[4:]))
 
-            data_dictionary['path'] = path
-            data_dictionary['filename'] = filename
-            data_dictionary['extension'] = extension
+_INFO_JSON_PREFIX = '[info] Writing video description metadata as JSON to: '
 
-        # Get final extension ffmpeg post process simple (not file merge)
-        if stdout[1] == 'Destination:':
-            path, filename, extension = extract_filename(' '.join(stdout_with_spaces[2:]))
 
-            data_dictionary['path'] = path
-            data_dictionary['filename'] = filename
-            data_dictionary['extension'] = extension    
+def _parse_info(stdout, tokens):
+    # '[info] Writing video description metadata as JSON to: <path>'
+    # gives the info file, see infocache.InfoCache
+    #
+    data_dictionary = {'status': 'Pre Processing'}
 
-        # Get final extension after recoding process
-        if stdout[1] == 'Converting':
-            path, filename, extension = extract_filename(' '.join(stdout_with_spaces[8:]))
+    line = stdout.lstrip()
+
+    if line.startswith(_INFO_JSON_PREFIX):
+        data_dictionary['info_json'] = line[len(_INFO_JSON_PREFIX):]
+
+    return data_dictionary
+
+
+def _ignore(stdout, tokens):
+    return {}
+
+
+# First token of the youtube-dl stdout lines mapped to their parser,
+# called with the line & the line split on whitespaces.
+# Any other '[...]' line means youtube-dl is still preparing the download.
+_STDOUT_PARSERS = {
+    '[download]': _parse_download,
+    '[hlsnative]': _parse_hlsnative,
+    '[ffmpeg]': _parse_ffmpeg,
+    '[info]': _parse_info,
+    '[debug]': _ignore,
+}
+
+
+def extract_data(stdout):
+    """Extract data from youtube-dl stdout.
+
+    Args:
+        stdout (string): Contains the youtube-dl stdout.
+
+    Ret:
+        python dict: The returned dict can be empty if there are
+        no data to extract eslt it may contrain one of more of the
+        following keys:
+
+        status: contains the status of the process download.
+        path: destination path
+        extension: the file extension
+        filenme: the file name with out ext
+        percent: the percentage of the video being downloaded.
+        eta: estimate time for the completion of the download process.
+        speed: download speed
+        filesize: the size of the video file being downloaded
+        playlist_index: the playlist index of the current video file being downloaded
+        playlist_size: the number of vides in the playlist
+        info_json: path of the info file youtube-dl wrote
+
+    Notes:
+        The line is dispatched on its first token through _STDOUT_PARSERS,
+        lines that don't start with '[' are skipped without being split.
+        See benchmarks/extract_data_bench.py for the equivalence check
+        against the previous parser.
+
+    """
+    if not stdout:
+        return {}
 
-            data_dictionary['path'] = path
-            data_dictionary['filename'] = filename
-            data_dictionary['extension'] = extension
+    if stdout[0] != '[' and stdout.lstrip()[:1] != '[':
+        # Just ignore this output
+        return {}
 
-    elif stdout[0][0] != '[' or stdout[0] == '[debug]':
-        pass  # Just ignore this output
+    tokens = stdout.split()
+    parser = _STDOUT_PARSERS.get(tokens[0])
 
-    else:
-        data_dictionary['status'] = 'Pre Processing'
+    if parser is None:
+        return {'status': 'Pre Processing'}
 
-    return data_dictionary
\ No newline at end of file
+    return parser(stdout, tokens)
@@ -10,6 +10,10 @@ Attributes:
 		
 	WORKER_PUB_TOPIC (string): Publisher subcription topic of the
 		Worker thread.
+
+	DOWNLOAD_ENGINES (dict): Download engine classes by the name used
+		in the 'download_engine' option. The 'pool' engine is created by
+		the DownloadManager since it needs the HostPool.
 		
 Notes:
 	It's not the actual module that download the urls
@@ -18,6 +22,9 @@ Notes:
 """
 import threading
 import time
+import queue
+import heapq
+import functools
 import os 
 #from wx import CallAfter
 from pubsub import pub as Publisher
@@ -39,6 +46,42 @@ from Threads.downloader import (
     YoutubeDLDownloader,
 )
 
+from Threads.ytdlhost import (
+    InProcessDownloader,
+)
+
+from Threads.hostpool import (
+    HostPool,
+    PooledDownloader,
+)
+
+from Threads.playlist import (
+    expand_playlist,
+    is_playlist_url,
+)
+
+from Threads.progressstore import (
+    ProgressStore,
+)
+
+from Threads.scheduler import (
+    BandwidthLimiter,
+    host_of,
+    saturated_hosts,
+)
+
+from Threads.archive import (
+    DownloadArchive,
+)
+
+from Threads.canonical import (
+    item_id,
+)
+
+from Threads.infocache import (
+    InfoCache,
+)
+
 from Threads.parsers import (
     OptionHolder,
     OptionsParser
@@ -53,26 +96,32 @@ from PyQt5.QtCore import (
 MANAGER_PUB_TOPIC = 'dlmanager'
 WORKER_PUB_TOPIC = 'dlworker'
 
-_SYNC_LOCK = RLock()
+# Download engines, see OptionsManager 'download_engine' option
+DOWNLOAD_ENGINES = {
+    'subprocess': YoutubeDLDownloader,
+    'inprocess': InProcessDownloader,
+}
 
-#+++++<DEBUG_LOG>
+# Configured once by main.setup_logging()
 import logging
-format = "%(asctime)s: %(message)s"
-logging.basicConfig(format=format, level=logging.INFO, datefmt='%H:%M:%S')
-logging.getLogger().setLevel(logging.DEBUG)
-#-----<DEBUG_LOG>
 
 # Decorator that adds thread synchronization to a function
 def synchronized(lock):
     def _decorator(func):
         def _wrapper(*args, **kwargs):
-            lock.acquire()
-            ret_value = func(*args, **kwargs)
-            lock.release()
-            return ret_value
+            # The lock is released even if func raises
+            with lock:
+                return func(*args, **kwargs)
         return _wrapper
     return _decorator
 
+# Decorator that synchronizes a method on the instance's own '_lock'
+def synchronized_method(func):
+    def _wrapper(self, *args, **kwargs):
+        with self._lock:
+            return func(self, *args, **kwargs)
+    return _wrapper
+
 
 class DownloadItem(object):
 
@@ -92,20 +141,38 @@ class DownloadItem(object):
 
         options (list): Options list to use during the download phase.
 
+        parent_id (int): object_id of the playlist item this item was
+            expanded from, None for the items added by the user.
+
+    Notes:
+        The 'host' attribute is the host the per-host download cap
+        applies to, see scheduler.host_of().
+
+        The 'object_id' is the same for equivalent urls (e.g. youtu.be/X
+        and youtube.com/watch?v=X) with the same options and in every
+        run, see canonical.item_id().
+
     """
 
     STAGES = ("Queued", "Active", "Paused", "Completed", "Error")
 
     ACTIVE_STAGES = ("Pre Processing", "Downloading", "Post Processing")
 
-    COMPLETED_STAGES = ("Finished", "Warning", "Already Downloaded")
+    COMPLETED_STAGES = ("Finished", "Warning", "Already Downloaded", "Expanded")
 
     ERROR_STAGES = ("Error", "Stopped", "Filesize Abort")
 
-    def __init__(self, url, options):
+    def __init__(self, url, options, parent_id=None):
         self.url = url
         self.options = options
-        self.object_id = hash(url + to_string(options))
+        self.object_id = item_id(url, options)
+        self.parent_id = parent_id
+        self.host = host_of(url)
+
+        # DownloadList that holds the item & the item's slot in
+        # the list's ProgressStore, see DownloadList.insert()
+        self._owner = None
+        self._slot = None
 
         self.reset()
 
@@ -120,6 +187,7 @@ class DownloadItem(object):
 
         if value == 'Queued':
             self.progress_stats["status"] = value
+            self.queued_time = time.time()
         if value == 'Active':
             self.progress_stats["status"] = self.ACTIVE_STAGES[0]
         if value == 'Paused':
@@ -129,13 +197,13 @@ class DownloadItem(object):
         if value == 'Error':
             self.progress_stats["status"] = self.ERROR_STAGES[0]
 
-        self._stage = value
+        self._move_to(value)
 
     def reset(self):
         if hasattr(self, '_stage') and self._stage == self.STAGES[1]:
             raise RuntimeError("Cannot reset an 'Active' item")
 
-        self._stage = self.STAGES[0]
+        self._move_to(self.STAGES[0])
         self.path = ''
         self.filenames = []
         self.extensions = []
@@ -158,6 +226,9 @@ class DownloadItem(object):
         # Keep track when the 'playlist_index' changes
         self.playlist_index_changed = False
 
+        # Time the item became ready for download, see Worker.download()
+        self.queued_time = time.time()
+
     def get_files(self):
         # Returns a list that contains all the system files bind to this object.
         #
@@ -219,16 +290,28 @@ class DownloadItem(object):
                 #self.progress_stats['filesize'] = format_bytes(post_proc_filesize)
 
             self._set_stage(status_dict['status'])
+
+        if self._owner is not None:
+            self._owner._on_progress(self, status_dict)
             
     def _set_stage(self, status):
         if status in self.ACTIVE_STAGES:
-            self._stage = self.STAGES[1]
+            self._move_to(self.STAGES[1])
 
         if status in self.COMPLETED_STAGES:
-            self._stage = self.STAGES[3]
+            self._move_to(self.STAGES[3])
 
         if status in self.ERROR_STAGES:
-            self._stage = self.STAGES[4]
+            self._move_to(self.STAGES[4])
+
+    def _move_to(self, stage):
+        # Change the main stage and keep the owner's stage indexes in sync
+        #
+        old_stage = getattr(self, '_stage', None)
+        self._stage = stage
+
+        if self._owner is not None and old_stage != stage:
+            self._owner._on_stage_change(self, old_stage, stage)
 
     def __eq__(self, other):
         return self.object_id == other.object_id
@@ -238,36 +321,115 @@ class DownloadList(object):
     """
     List like data structure that contains DownloadItem.
 
+    Besides the sequence of object ids the list keeps:
+        - A map object_id -> position, refreshed lazily after removals.
+        - An order key per item that grows with the position in the list.
+        - Per-stage sets and min-heaps of (order key, object_id), so the
+          first item of a stage is found without walking the whole list.
+          Heap entries are invalidated lazily (removed item, changed key
+          or stage) and dropped when they reach the top.
+        - The same set & heap for the queued items of every host, used
+          by fetch_next() to skip the hosts that reached their cap.
+        - A ProgressStore ('progress' attribute) with the numeric progress
+          of every item, for the whole-list statistics.
+
+    Every list has its own lock. get_items() returns an immutable snapshot
+    that is rebuilt only when the sequence changes (insert, remove, move,
+    clear), so readers like the GUI timer do not hold the lock while they
+    walk the items. Plain lookups (get_item_by_objectid, has_item, ...)
+    are single dict/list operations and don't take the lock either.
+
     Args:
         items (list): List that contains DownloadItem.
     """
     def __init__(self, dl_items=None):
         assert isinstance(dl_items, list) or dl_items is None
 
-        if dl_items is None:
-            self._items_dict = {} # Speed up lookup
-            self._items_list = [] # Keep the sequence
-        else:
-            self._items_dict = {item.object_id: item for item in dl_items}
-            self._items_list = [item.object_id for item in dl_items]
+        self._lock = RLock()
+
+        # Callbacks to notify when an item becomes available for download
+        self._listeners = []
 
-    @synchronized(_SYNC_LOCK)
+        # Sequence version and the (version, items) snapshot of get_items()
+        self._version = 0
+        self._snapshot = (0, ())
+
+        self._reset_indexes()
+
+        if dl_items is not None:
+            for item in dl_items:
+                self._insert(item)
+
+    def _reset_indexes(self):
+        self._items_dict = {} # Speed up lookup
+        self._items_list = [] # Keep the sequence
+
+        self._positions = {}  # object_id -> index in self._items_list
+        self._valid_upto = 0  # Positions below this index are up to date
+        self._order = {}      # object_id -> order key
+        self._next_order = 0
+
+        self._stage_ids = {stage: set() for stage in DownloadItem.STAGES}
+        self._stage_heaps = {stage: [] for stage in DownloadItem.STAGES}
+
+        # Queued items per host
+        self._host_ids = {}
+        self._host_heaps = {}
+
+        # Numeric progress, one slot per item
+        self.progress = ProgressStore(DownloadItem.STAGES)
+
+    @synchronized_method
+    def add_listener(self, callback):
+        # Call the given callback (no arguments) every time an item is
+        # inserted or re-queued. Used by the DownloadManager to wake up.
+        #
+        self._listeners.append(callback)
+
+    @synchronized_method
+    def remove_listener(self, callback):
+        # Remove a callback registered with add_listener()
+        #
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    @synchronized_method
     def clear(self):
         # Removes all the items from the list even the 'Active' ones.
         #
-        self._items_list = []
-        self._items_dict = {}
+        for item in self._items_dict.values():
+            item._owner = None
+            item._slot = None
 
-    @synchronized(_SYNC_LOCK)
+        self._reset_indexes()
+        self._version += 1
+
+    @synchronized_method
     def insert(self, item):
         """
         Insert the given download item to the list.
         Does not check for duplicates.
         """        
-        self._items_list.append(item.object_id)
-        self._items_dict[item.object_id] = item
+        self._insert(item)
+        self._version += 1
+        self._notify()
+
+    @synchronized_method
+    def add(self, item):
+        """
+        Insert the given download item unless the list has an item with
+        the same object_id (same canonical url & options).
 
-    @synchronized(_SYNC_LOCK)
+        Returns:
+            True if the item was inserted else False.
+        """
+        if item.object_id in self._items_dict:
+            return False
+
+        self.insert(item)
+        return True
+
+    @synchronized_method
     def remove(self, object_id):
         """
         Removes download item from the list.
@@ -278,89 +440,281 @@ class DownloadList(object):
         Returns:
             True on success else False.
         """     
-        
-        if self._items_dict[object_id].stage != 'Active':
-            self._items_list.remove(object_id)   #Remove from list 
+        item = self._items_dict[object_id]
+
+        if item.stage != 'Active':
+            index = self._index(object_id)
+
+            del self._items_list[index]          #Remove from list 
             del self._items_dict[object_id]      #Remove form dict
+            del self._positions[object_id]
+            del self._order[object_id]
+            self._stage_ids[item.stage].discard(object_id)
+
+            if item.stage == 'Queued':
+                self._host_ids[item.host].discard(object_id)
+
+            self.progress.free(item._slot)
+            item._slot = None
+
+            # Every item after the removed one moved up by one
+            self._valid_upto = min(self._valid_upto, index)
+            self._version += 1
+
+            item._owner = None
             return True
         return False
 
-    @synchronized(_SYNC_LOCK)
-    def fetch_next(self):
-        # Returns the next queued item on the list.
+    @synchronized_method
+    def fetch_next(self, exclude_hosts=None):
+        # Returns the next queued item on the list. Items whose host
+        # is in exclude_hosts are skipped.
 		#
-        for object_id in self._items_list:
-            cur_item = self._items_dict[object_id]
-            if cur_item.stage == 'Queued':
-                return cur_item
-        return None
+        if not exclude_hosts:
+            return self._first_of_stage('Queued')
+
+        next_item = None
 
-    @synchronized(_SYNC_LOCK)
+        for host, heap in self._host_heaps.items():
+            if host in exclude_hosts:
+                continue
+
+            item = self._first_in_heap(self._host_ids[host], heap)
+
+            if item is not None and (next_item is None or
+                                     self._order[item.object_id] < self._order[next_item.object_id]):
+                next_item = item
+
+        return next_item
+
+    @synchronized_method
     def move_up(self, object_id):
         # Moves the selected item with the corresponding object_id up to the list.
         #
-        index = self._items_list.index(object_id)
+        index = self._index(object_id)
 
         if index > 0:
             self._swap(index, index - 1)
             return True
         return False
 
-    @synchronized(_SYNC_LOCK)
+    @synchronized_method
     def move_down(self, object_id):
         # Moves the item with the corresponding object_id down to the list.
         #
-        index = self._items_list.index(object_id)
+        index = self._index(object_id)
 
         if index < (len(self._items_list) - 1):
             self._swap(index, index + 1)
             return True
         return False
 
-    @synchronized(_SYNC_LOCK)
     def get_item_by_objectid(self, object_id):
 		# Return the download item with the given object_id
         #
         return self._items_dict[object_id]
 
-    @synchronized(_SYNC_LOCK)
     def get_objectid_by_index(self, index):
   		# Return the download item with the given index
         # 
         return self._items_list[index]
 
-    @synchronized(_SYNC_LOCK)
     def has_item(self, object_id):
         # Return True if the given object_id is in the list
         #
-        return object_id in self._items_list
+        return object_id in self._items_dict
+
+    @property
+    def version(self):
+        # Number that changes every time the sequence of items changes
+        #
+        return self._version
 
-    @synchronized(_SYNC_LOCK)
     def get_items(self):
-        # Return the list with all the items.
+        # Return a tuple (read-only snapshot) with all the items.
         #
-        return [self._items_dict[object_id] for object_id in self._items_list]
+        version, items = self._snapshot
+
+        if version != self._version:
+            with self._lock:
+                version, items = self._snapshot
 
-    @synchronized(_SYNC_LOCK)
+                if version != self._version:
+                    items = tuple(self._items_dict[object_id] for object_id in self._items_list)
+                    self._snapshot = (self._version, items)
+
+        return items
+
+    @synchronized_method
     def change_stage(self, object_id, new_stage):
         # Change the stage of the item with the given object_id
         #
         self._items_dict[object_id].stage = new_stage
 
-    @synchronized(_SYNC_LOCK)
+        if new_stage == 'Queued':
+            self._notify()
+
+    @synchronized_method
     def index(self, object_id):
         # Get the zero based index of the item with the given object_id."""
         #
-        if object_id in self._items_list:
-            return self._items_list.index(object_id)
+        if object_id in self._items_dict:
+            return self._index(object_id)
         return -1
 
-    @synchronized(_SYNC_LOCK)
     def __len__(self):
         return len(self._items_list)
 
+    @synchronized_method
+    def _on_stage_change(self, item, old_stage, new_stage):
+        # Called by DownloadItem every time its main stage changes
+        #
+        object_id = item.object_id
+
+        if self._items_dict.get(object_id) is not item:
+            return
+
+        if old_stage is not None:
+            self._stage_ids[old_stage].discard(object_id)
+
+            if old_stage == 'Queued':
+                self._host_ids[item.host].discard(object_id)
+
+        self.progress.set_stage(item._slot, new_stage)
+        self._add_to_stage(object_id, new_stage)
+
+    @synchronized_method
+    def _on_progress(self, item, status_dict):
+        # Called by DownloadItem.update_status() with the new values
+        #
+        if self._items_dict.get(item.object_id) is item:
+            self.progress.update(item._slot, status_dict)
+
+    def _insert(self, item):
+        object_id = item.object_id
+
+        if self._valid_upto == len(self._items_list):
+            self._valid_upto += 1
+
+        self._positions[object_id] = len(self._items_list)
+        self._items_list.append(object_id)
+        self._items_dict[object_id] = item
+
+        self._order[object_id] = self._next_order
+        self._next_order += 1
+
+        item._owner = self
+        item._slot = self.progress.allocate(item.stage)
+        self._add_to_stage(object_id, item.stage)
+
+    def _index(self, object_id):
+        # Return the position of object_id, refreshing stale positions
+        #
+        index = self._positions[object_id]
+
+        if index >= self._valid_upto:
+            for position in range(self._valid_upto, len(self._items_list)):
+                self._positions[self._items_list[position]] = position
+
+            self._valid_upto = len(self._items_list)
+            index = self._positions[object_id]
+
+        return index
+
+    def _add_to_stage(self, object_id, stage):
+        self._push(self._stage_ids[stage], self._stage_heaps[stage], object_id)
+
+        if stage == 'Queued':
+            host = self._items_dict[object_id].host
+
+            if host not in self._host_ids:
+                self._host_ids[host] = set()
+                self._host_heaps[host] = []
+
+            self._push(self._host_ids[host], self._host_heaps[host], object_id)
+
+    def _push(self, ids, heap, object_id):
+        ids.add(object_id)
+        heapq.heappush(heap, (self._order[object_id], object_id))
+
+        # Drop the invalidated entries once they dominate the heap
+        if len(heap) > 2 * len(ids) + 64:
+            heap[:] = [(self._order[oid], oid) for oid in ids]
+            heapq.heapify(heap)
+
+    def _first_of_stage(self, stage):
+        # Return the first item (in list order) of the given stage or None
+        #
+        return self._first_in_heap(self._stage_ids[stage], self._stage_heaps[stage])
+
+    def _first_in_heap(self, ids, heap):
+        while heap:
+            order, object_id = heap[0]
+
+            if object_id in ids and self._order[object_id] == order:
+                return self._items_dict[object_id]
+
+            heapq.heappop(heap)
+
+        return None
+
     def _swap(self, index1, index2):
-        self._items_list[index1], self._items_list[index2] = self._items_list[index2], self._items_list[index1]
+        id1, id2 = self._items_list[index1], self._items_list[index2]
+
+        self._items_list[index1], self._items_list[index2] = id2, id1
+        self._positions[id1], self._positions[id2] = index2, index1
+
+        # Exchange the order keys so the heaps follow the new sequence
+        self._order[id1], self._order[id2] = self._order[id2], self._order[id1]
+
+        for object_id in (id1, id2):
+            item = self._items_dict[object_id]
+            heapq.heappush(self._stage_heaps[item.stage], (self._order[object_id], object_id))
+
+            if item.stage == 'Queued':
+                heapq.heappush(self._host_heaps[item.host], (self._order[object_id], object_id))
+
+        self._version += 1
+
+    def _notify(self):
+        for callback in self._listeners:
+            callback()
+
+
+def complete_archived(download_list, archive, item):
+    """Complete the item without youtube-dl if its video is in the archive.
+
+    Shared by DownloadManager & asyncmanager.AsyncDownloadManager. A
+    playlist item is never completed, its other entries may be new.
+
+    Args:
+        download_list (DownloadList): List of the item.
+
+        archive (archive.DownloadArchive): The download archive or None.
+
+        item (DownloadItem): Item about to be downloaded.
+
+    Ret:
+        True if the item was completed, else False.
+
+    """
+    if archive is None or is_playlist_url(item.url) or item.url not in archive:
+        return False
+
+    download_list.change_stage(item.object_id, 'Completed')
+
+    data = {'index': item.object_id, 'status': 'Already Downloaded', 'percent': '100%'}
+    Publisher.sendMessage(WORKER_PUB_TOPIC, data=('send', data))
+
+    return True
+
+
+def expands_in_process(opt_manager):
+    # True if playlists are expanded with the youtube_dl module, only
+    # the 'inprocess' engine has it in this process ('pool' keeps it in
+    # its host processes)
+    #
+    return opt_manager.options['download_engine'] == 'inprocess'
 
 
 class DownloadManager(Thread):
@@ -393,9 +747,52 @@ class DownloadManager(Thread):
         self._successful = 0
         self._running = True
 
+        # Resolve playlists into single items before downloading them
+        self._expand_playlists = opt_manager.options['expand_playlists']
+
+        # Set when an item is queued or a worker becomes free (event dispatch)
+        self._event_dispatch = opt_manager.options['event_dispatch']
+        self._wakeup = threading.Event()
+
+        # Per-host download cap & global bandwidth budget
+        self._max_per_host = opt_manager.options['max_per_host']
+        self._bandwidth = BandwidthLimiter(opt_manager.options['bandwidth_limit'],
+                                           opt_manager.options['workers_number'])
+
+        # Options that apply the bandwidth share to every youtube-dl process
+        self._rate_options = self._bandwidth.rate_options()
+
+        # Videos youtube-dl already downloaded, see _skip_archived()
+        self._archive = None
+        if opt_manager.options['download_archive']:
+            self._archive = DownloadArchive(opt_manager.options['download_archive'])
+
+        # Video info youtube-dl extracted, shared by the workers
+        info_cache = None
+        if opt_manager.options['info_cache_ttl']:
+            info_cache = InfoCache(os.path.join(opt_manager.config_path, 'info_cache'),
+                                   opt_manager.options['info_cache_ttl'],
+                                   opt_manager.options['info_cache_size'])
+
+        # Warm youtube-dl host processes for the 'pool' engine, started by run()
+        self._host_pool = None
+        engine = None
+
+        if opt_manager.options['download_engine'] == 'pool':
+            self._host_pool = HostPool(opt_manager.options['workers_number'],
+                                       self._youtubedl_path(),
+                                       opt_manager.options['host_max_jobs'])
+            engine = functools.partial(PooledDownloader, self._host_pool)
+
+        if opt_manager.options['download_engine'] == 'inprocess':
+            # The in-process downloads share one token bucket instead
+            self._rate_options = ()
+            engine = functools.partial(InProcessDownloader, bandwidth=self._bandwidth)
+
         # Init the custom workers thread pool
         log_lock = None if log_manager is None else Lock()
-        wparams  = (opt_manager, self._youtubedl_path(), log_manager, log_lock)
+        wparams  = (opt_manager, self._youtubedl_path(), log_manager, log_lock,
+                    self._event_dispatch, self._wakeup.set, engine, info_cache)
         self._workers = [Worker(*wparams) for _ in range(opt_manager.options["workers_number"])]
 
         #self.thread = QThread()
@@ -414,45 +811,132 @@ class DownloadManager(Thread):
         to complete. """
         return self._time_it_took
 
+    @property
+    def dispatch_latency(self):
+        """Returns a dict with the number of dispatched items ('count') and
+        the 'average' and 'maximum' time (seconds) between an item becoming
+        ready (queued and a worker free) and a worker starting on it. """
+        count = total = maximum = 0
+
+        for worker in self._workers:
+            w_count, w_total, w_maximum = worker.latency_stats
+            count += w_count
+            total += w_total
+            maximum = max(maximum, w_maximum)
+
+        average = total / count if count else 0.0
+
+        return {'count': count, 'average': average, 'maximum': maximum}
+
     def run(self):
         #self._runlongtask()    #<ANH_DEBUG>        
         self._check_youtubedl()
+
+        # Spawned here, the constructor runs on the GUI thread
+        if self._host_pool is not None:
+            self._host_pool.start()
         self._time_it_took = time.time()
 
+        if self._event_dispatch:
+            self.download_list.add_listener(self._wakeup.set)
+            self._run_event_dispatch()
+            self.download_list.remove_listener(self._wakeup.set)
+        else:
+            self._run_polling_dispatch()
+
+        # Close all the workers
+        for worker in self._workers:
+            worker.close()
+
+        # Join and collect data
+        for worker in self._workers:
+            worker.join()
+            self._successful += worker.successful
+
+        if self._host_pool is not None:
+            self._host_pool.close()
+
+        self._time_it_took = time.time() - self._time_it_took
+
+        logging.info("Dispatch latency: %(count)d items, avg %(average).4fs, max %(maximum).4fs",
+                     self.dispatch_latency)
+
+        if not self._running:
+            self._talk_to_gui('closed')
+        else:
+            self._talk_to_gui('finished')
+
+    def _run_polling_dispatch(self):
+        # Check the download list for queued items every WAIT_TIME
+        #
         while self._running:
 
             #logging.info("___while self._running: TRUE____________")
 
-            item = self.download_list.fetch_next()
+            item = self.download_list.fetch_next(self._saturated_hosts())
+
+            if item is not None and self._skip_archived(item):
+                continue
 
             if item is not None:
                 worker = self._get_worker()
                 #worker = self._workers #<ANH_DEBUG>
 
                 if worker is not None:
-                    worker.download(item.url, item.options, item.object_id)
-                    self.download_list.change_stage(item.object_id, 'Active')
+                    self._dispatch(worker, item)
             
             if item is None and self._jobs_done():
                 break
 
             time.sleep(self.WAIT_TIME)
 
-        # Close all the workers
-        for worker in self._workers:
-            worker.close()
+    def _run_event_dispatch(self):
+        # Sleep until an item is queued or a worker becomes free.
+        # The wakeup flag is cleared *before* looking at the list & workers
+        # so a notification that arrives in between is never lost.
+        #
+        while self._running:
+            self._wakeup.clear()
 
-        # Join and collect data
-        for worker in self._workers:
-            worker.join()
-            self._successful += worker.successful
+            item = self.download_list.fetch_next(self._saturated_hosts())
 
-        self._time_it_took = time.time() - self._time_it_took
+            if item is not None and self._skip_archived(item):
+                continue
 
-        if not self._running:
-            self._talk_to_gui('closed')
+            if item is None and self._jobs_done():
+                break
+
+            worker = None if item is None else self._get_worker()
+
+            if worker is not None:
+                self._dispatch(worker, item)
+                continue
+
+            self._wakeup.wait()
+
+    def _skip_archived(self, item):
+        # Complete the item without a worker if its video is in the
+        # download archive. Returns True if the item was completed
+        #
+        if not complete_archived(self.download_list, self._archive, item):
+            return False
+
+        self._successful += 1
+        return True
+
+    def _dispatch(self, worker, item):
+        # Hand the item to the worker. The stage is changed first so
+        # the worker's own status updates are not overwritten.
+        #
+        ready_time = max(item.queued_time, worker.idle_since)
+        options = item.options + self._rate_options
+
+        self.download_list.change_stage(item.object_id, 'Active')
+
+        if self._expand_playlists and item.parent_id is None and is_playlist_url(item.url):
+            worker.expand(item.url, options, item.object_id, ready_time)
         else:
-            self._talk_to_gui('finished')
+            worker.download(item.url, options, item.object_id, ready_time)
 
     def _download_complete(self):
         logging.info("_____download_complete____________")
@@ -517,6 +1001,7 @@ class DownloadManager(Thread):
         """
         self._talk_to_gui('closing')
         self._running = False
+        self._wakeup.set()
 
     def add_url(self, url):
         """Add given url to the download_list
@@ -566,6 +1051,12 @@ class DownloadManager(Thread):
                 return worker
         return None
 
+    def _saturated_hosts(self):
+        # Return the hosts that reached the 'max_per_host' cap
+        #
+        active_hosts = [worker.host for worker in self._workers if not worker.available()]
+        return saturated_hosts(active_hosts, self._max_per_host)
+
     def _jobs_done(self):
         # Return True if the workers have finished their job, else False
         #
@@ -594,6 +1085,19 @@ class Worker(Thread):
             If the log_manager is set (not None) then the caller has to make sure
             that the log_lock is also set.
 
+        event_dispatch (boolean): If True the worker blocks on its job queue
+            until download() is called instead of polling every WAIT_TIME.
+
+        idle_hook (function): Optional callback (no arguments) called every
+            time the worker finishes an item and becomes available.
+
+        engine (function): Optional factory with the YoutubeDLDownloader
+            signature used to create the downloader. Defaults to the
+            DOWNLOAD_ENGINES entry of the 'download_engine' option.
+
+        info_cache (infocache.InfoCache): Optional cache of the video info,
+            the downloads of the urls in it skip the info extraction.
+
     Notes:
         For available data keys see self._data under the __init__() method.
 
@@ -604,13 +1108,40 @@ class Worker(Thread):
     #finished = pyqtSignal()        #<ANH_DEBUG>
     #progress = pyqtSignal(dict)    #<ANH_DEBUG>
 
-    def __init__(self, opt_manager, youtubedl, log_manager=None, log_lock=None ):
+    def __init__(self, opt_manager, youtubedl, log_manager=None, log_lock=None,
+                 event_dispatch=False, idle_hook=None, engine=None, info_cache=None):
         super(Worker, self).__init__()
         self.opt_manager = opt_manager
         self.log_manager = log_manager
         self.log_lock = log_lock
+        self.idle_hook = idle_hook
+        self.youtubedl = youtubedl
+
+        # Info files youtube-dl wrote during the current download
+        self._info_cache = info_cache
+        self._info_files = []
+
+        # Time since the worker is waiting for a job
+        self.idle_since = time.time()
+
+        # Host of the current job, see scheduler.host_of()
+        self.host = None
 
-        self._ytbdownloader = YoutubeDLDownloader(youtubedl, self._data_hook, self._log_data)
+        self._jobs = queue.Queue() if event_dispatch else None
+        self._ready_time = None
+
+        # True when the current job is a playlist expansion
+        self._expand = False
+
+        # Dispatch latency: dispatched items, total & max latency (seconds)
+        self._dispatched = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+        if engine is None:
+            engine = DOWNLOAD_ENGINES[opt_manager.options['download_engine']]
+
+        self._ytbdownloader = engine(youtubedl, self._data_hook, self._log_data)
         self._opt_parser = OptionsParser()
         self._successful = 0
         self._running = True
@@ -642,25 +1173,44 @@ class Worker(Thread):
         """
         return self._successful
 
+    @property
+    def latency_stats(self):
+        """Return (dispatched items, total latency, max latency) in seconds
+        """
+        return self._dispatched, self._latency_total, self._latency_max
+
     def run(self):
         while self._running:
             if self._data['url'] is not None:
-                #options = self._options_parser.parse(self.opt_manager.options)
-                ret_code = self._ytbdownloader.download(self._data['url'], self._options)
+                self._record_latency()
+
+                if self._expand and self._expand_playlist():
+                    ret_code = None
+                else:
+                    #options = self._options_parser.parse(self.opt_manager.options)
+                    ret_code = self._download(self._data['url'], self._options)
 
                 if (ret_code == YoutubeDLDownloader.OK or 
                         ret_code == YoutubeDLDownloader.ALREADY or 
                         ret_code == YoutubeDLDownloader.WARNING):
                     self._successful += 1
 
+                self.idle_since = time.time()
                 self._reset()
 
-            time.sleep(self.WAIT_TIME)         
+                if self.idle_hook is not None:
+                    self.idle_hook()
+
+            if self._jobs is None:
+                time.sleep(self.WAIT_TIME)
+            else:
+                # Block until download() or close() wakes us up
+                self._jobs.get()
 
         # Call the destructor function of YoutubeDLDownloader object
         self._ytbdownloader.close()
 
-    def download(self, url, options, object_id):
+    def download(self, url, options, object_id, ready_time=None):
         """ Download given item.
 
         Args:
@@ -668,10 +1218,22 @@ class Worker(Thread):
             The url and the index of the corresponding row in which
             the worker should send back the information about the 
             download process.     
+
+            ready_time (float): Time the item became ready for download,
+                used to measure the dispatch latency. Defaults to now.
         """
-        self._data['url'] = url
-        self._options = options
-        self._data['index'] = object_id
+        self._assign(url, options, object_id, ready_time, False)
+
+    def expand(self, url, options, object_id, ready_time=None):
+        """ Expand the given playlist item into its entries.
+
+        The entries urls are sent to the GUI with an 'expand' signal.
+        If the url can not be expanded it is downloaded as a single item.
+
+        Args:
+            See download()
+        """
+        self._assign(url, options, object_id, ready_time, True)
 
     def stop_download(self):
         """Stop the download process of the worker
@@ -686,6 +1248,9 @@ class Worker(Thread):
         self._running = False
         self._ytbdownloader.stop()
 
+        if self._jobs is not None:
+            self._jobs.put_nowait(False)
+
     def available(self):
         """ Return True if the worker has no job, else False    
         """
@@ -712,6 +1277,63 @@ class Worker(Thread):
         for key in self._data:
             self._data[key] = None
 
+    def _assign(self, url, options, object_id, ready_time, expand):
+        # Set the job data, the url is set last since it marks
+        # the worker as busy and starts the job
+        #
+        self._ready_time = time.time() if ready_time is None else ready_time
+        self._expand = expand
+        self._options = options
+        self.host = host_of(url)
+        self._data['index'] = object_id
+        self._data['url'] = url
+
+        if self._jobs is not None:
+            self._jobs.put_nowait(True)
+
+    def _download(self, url, options):
+        # Download url, through the info cache if there is one.
+        # Only the info of a single video can replace the extraction,
+        # see InfoCache.accepts()
+        #
+        if self._info_cache is None or not self._info_cache.accepts(url):
+            return self._ytbdownloader.download(url, options)
+
+        self._info_files = []
+        cache_options, cached = self._info_cache.prepare(url, options)
+
+        ret_code = self._ytbdownloader.download(url, cache_options)
+
+        success = ret_code in (YoutubeDLDownloader.OK,
+                               YoutubeDLDownloader.ALREADY,
+                               YoutubeDLDownloader.WARNING)
+
+        self._info_cache.finish(url, options, cached, self._info_files, success)
+
+        return ret_code
+
+    def _expand_playlist(self):
+        # Return True if the playlist was expanded
+        #
+        urls = expand_playlist(self.youtubedl, self._data['url'], self._options,
+                               expands_in_process(self.opt_manager))
+
+        if urls is None:
+            return False
+
+        self._talk_to_gui('expand', {'urls': urls})
+        self._talk_to_gui('send', {'status': 'Expanded', 'playlist_size': to_string(len(urls))})
+        return True
+
+    def _record_latency(self):
+        # Account the time between the item becoming ready and now
+        #
+        latency = max(0.0, time.time() - self._ready_time)
+
+        self._dispatched += 1
+        self._latency_total += latency
+        self._latency_max = max(self._latency_max, latency)
+
     def _log_data(self, data):
         """Callback method for self._ytbdownloader.
 
@@ -728,7 +1350,8 @@ class Worker(Thread):
             and release() will be called when the block is exited.
             """
             with self.log_lock:
-                self.log_manager.OutputLog(data)
+                self.log_manager.log_record(data, self._data['index'],
+                                            self._data['url'], self._data['status'])
 
     def _data_hook(self, data):
         """Callback method for self._ytbdownloader.
@@ -742,6 +1365,13 @@ class Worker(Thread):
                 extract_data() function under the downloader.py module
 
         """
+        if 'status' in data:
+            # Stage of the log records, see _log_data()
+            self._data['status'] = data['status']
+
+        if 'info_json' in data:
+            self._info_files.append(data['info_json'])
+
         self._talk_to_gui('send', data)
 
     def _talk_to_gui(self, topic, data):
@@ -767,15 +1397,19 @@ class Worker(Thread):
                         to store the retrieved data.
 
         Note: 
-            Worker class supports 2 signals:
+            Worker class supports 3 signals:
                 1) send: The worker sends data back to the GUI
                     (ex: Send status updates)
                 2) receive: The worker asks data from the GUI
                     (ex: Receive the name of a file)
+                3) expand: The worker resolved a playlist, the GUI should
+                    add the entries as new items (children of 'index')
 
         Structure:
             ('send', {'index': <item_row>, data_to_send*})
 
+            ('expand', {'index': <item_row>, 'urls': [entry_url*]})
+
             ('receive', {'index': <item_row>, 'source': 'source_key', 'dest': 'destination_key'})
   
         """
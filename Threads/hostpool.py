@@ -0,0 +1,365 @@
+# This Python file uses the following encoding: utf-8
+""" YoutubeDlg module for a pool of warm youtube-dl host processes.
+
+Every host is a long-lived child process that has already imported
+youtube_dl. It receives (url, options) jobs over a pipe, runs them with
+ytdlhost.InProcessDownloader and streams the progress dicts back, so
+downloads keep the process isolation of the subprocess engine without
+paying the interpreter startup for every URL.
+
+Attributes:
+    START_METHOD (string): multiprocessing start method of the hosts.
+        'spawn' avoids forking the threads of the GUI process.
+
+Notes:
+    spawn runs the module of __main__ again in every child to find the
+    functions it pickled by reference. The hosts only need this module,
+    so they are started with a bare __main__ (see _bare_main()) instead
+    of main.py with PyQt5 & the GUI.
+
+    Messages from a host are tuples:
+        ('data', dict): extract_data() dict for the data_hook.
+        ('log', string): stderr line for the log_data callback.
+        ('done', int): Download finished with the given return code.
+
+"""
+
+import os
+import sys
+import queue
+import logging
+import types
+import signal
+import multiprocessing
+
+from contextlib import contextmanager
+from threading import Lock
+
+from .downloader import BaseDownloader
+
+START_METHOD = 'spawn'
+
+# Serializes the __main__ swaps of _bare_main()
+_start_lock = Lock()
+
+
+@contextmanager
+def _bare_main():
+    # Show an empty __main__ to the spawn preparation of the started
+    # processes, the host entry point lives in this module
+    #
+    with _start_lock:
+        main_module = sys.modules['__main__']
+        sys.modules['__main__'] = types.ModuleType('__main__')
+
+        try:
+            yield
+        finally:
+            sys.modules['__main__'] = main_module
+
+
+def _host_main(conn, youtubedl_path):
+    # Entry point of the host process
+    #
+    if os.name != 'nt':
+        # Make the host the process group leader in order to kill
+        # it together with its ffmpeg children using os.killpg
+        os.setsid()
+
+    from .ytdlhost import InProcessDownloader, load_youtube_dl
+
+    # Warm up, the import is the expensive part
+    load_youtube_dl()
+
+    def data_hook(data):
+        conn.send(('data', data))
+
+    def log_data(data):
+        conn.send(('log', data))
+
+    downloader = InProcessDownloader(youtubedl_path, data_hook, log_data)
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        if job is None:
+            break
+
+        url, options = job
+        conn.send(('done', downloader.download(url, options)))
+
+    downloader.close()
+
+
+class HostProcess(object):
+    """
+    Handle of one youtube-dl host process.
+
+    Args:
+        youtubedl_path (string): Absolute path to youtube-dl binary, used
+            by the host when it has to fall back to the subprocess engine.
+
+    Notes:
+        A host that could not be started (spawn failure, out of file
+        descriptors) is not an error of the constructor, the handle is
+        broken and send() raises OSError like for a dead host.
+
+    """
+
+    JOIN_TIMEOUT = 5
+
+    def __init__(self, youtubedl_path):
+        context = multiprocessing.get_context(START_METHOD)
+
+        self.jobs = 0
+
+        # Set by the user of the host when the pipe broke
+        self.broken = False
+
+        self._conn = self._proc = None
+        child_conn = None
+
+        try:
+            self._conn, child_conn = context.Pipe()
+            self._proc = context.Process(target=_host_main,
+                                         args=(child_conn, youtubedl_path),
+                                         daemon=True)
+
+            with _bare_main():
+                self._proc.start()
+        except Exception:
+            logging.exception("Could not start a youtube-dl host process")
+            self.broken = True
+
+            if self._conn is not None:
+                self._conn.close()
+        finally:
+            if child_conn is not None:
+                child_conn.close()
+
+    def alive(self):
+        # Return True if the host process is running
+        #
+        return self._proc is not None and self._proc.pid is not None and self._proc.is_alive()
+
+    def send(self, job):
+        if self._conn is None or self._conn.closed:
+            raise OSError('youtube-dl host process is not running')
+
+        self.jobs += 1
+        self._conn.send(job)
+
+    def recv(self):
+        # Blocks until the next message. Raises EOFError if the host died.
+        #
+        return self._conn.recv()
+
+    def kill(self):
+        # Kill the host and every process in its group
+        #
+        if not self.alive():
+            return
+
+        if os.name == 'nt':
+            self._proc.kill()
+        else:
+            try:
+                os.killpg(self._proc.pid, signal.SIGKILL)
+            except OSError:
+                self._proc.kill()
+
+    def close(self):
+        # Ask the host to exit, kill it if it doesn't
+        #
+        if self.alive():
+            try:
+                self._conn.send(None)
+            except (OSError, ValueError):
+                pass
+
+            self._proc.join(self.JOIN_TIMEOUT)
+
+        self.kill()
+
+        if self._proc is not None and self._proc.pid is not None:
+            self._proc.join()
+
+        if self._conn is not None:
+            self._conn.close()
+
+
+class HostPool(object):
+    """
+    Pool of pre-started youtube-dl host processes.
+
+    Hosts are recycled after max_jobs downloads or when they died
+    (crash, stop()). No host runs before start(), which blocks while the
+    hosts are spawned and should not run on the GUI thread.
+
+    Args:
+        size (int): Number of host processes to keep.
+
+        youtubedl_path (string): Absolute path to youtube-dl binary.
+
+        max_jobs (int): Number of downloads after which a host is replaced.
+            Zero means never.
+
+    """
+
+    def __init__(self, size, youtubedl_path, max_jobs=0):
+        self.youtubedl_path = youtubedl_path
+        self.max_jobs = max_jobs
+
+        self.size = size
+
+        self._lock = Lock()
+        self._closed = False
+        self._hosts = []
+        self._idle = queue.Queue()
+
+    def start(self):
+        # Spawn the host processes
+        #
+        for _ in range(self.size):
+            self._idle.put(self._new_host())
+
+    def acquire(self):
+        # Return an idle host, blocks until one is available. A host that
+        # failed to start is replaced once, if that fails too the caller
+        # gets the broken handle and its download fails
+        #
+        host = self._idle.get()
+
+        if (host.broken or not host.alive()) and not self._closed:
+            host = self._replace(host)
+
+        return host
+
+    def release(self, host):
+        # Give the host back to the pool, replacing it if needed. Never
+        # raises, it runs at the end of every download of a Worker
+        #
+        if self._closed:
+            return
+
+        if host.broken or not host.alive() or (self.max_jobs and host.jobs >= self.max_jobs):
+            host = self._replace(host)
+
+        self._idle.put(host)
+
+    def close(self):
+        # Shut down all the host processes
+        #
+        with self._lock:
+            self._closed = True
+            hosts, self._hosts = self._hosts, []
+
+        for host in hosts:
+            host.close()
+
+    def _replace(self, host):
+        # Return a new host in place of the given one
+        #
+        with self._lock:
+            if host in self._hosts:
+                self._hosts.remove(host)
+
+        try:
+            host.close()
+        except Exception:
+            logging.exception("Could not close a youtube-dl host process")
+
+        return self._new_host()
+
+    def _new_host(self):
+        host = HostProcess(self.youtubedl_path)
+
+        with self._lock:
+            self._hosts.append(host)
+
+        return host
+
+
+class PooledDownloader(BaseDownloader):
+    """
+    Download engine that runs each download on a HostPool host.
+
+    Same contract as downloader.YoutubeDLDownloader, see BaseDownloader.
+
+    Args:
+        host_pool (HostPool): Pool to take the host processes from.
+
+        youtubedl_path (string): Absolute path to youtube-dl binary.
+
+        data_hook (function): Optional callback function to retrieve download
+            process data.
+
+        log_data (function): Optional callback function to write data to
+            the log file.
+
+    """
+
+    def __init__(self, host_pool, youtubedl_path, data_hook=None, log_data=None):
+        super(PooledDownloader, self).__init__(data_hook, log_data)
+        self.youtubedl_path = youtubedl_path
+
+        self._pool = host_pool
+        self._host = None
+        self._stopped = False
+
+    def download(self, url, options):
+        """Download url using given options.
+
+        See downloader.YoutubeDLDownloader.download() for the return codes.
+        """
+        self._ret_code = self.OK
+        self._stopped = False
+
+        host = self._pool.acquire()
+        self._host = host
+
+        try:
+            host.send((url, options))
+
+            while True:
+                kind, value = host.recv()
+
+                if kind == 'data':
+                    self._hook_data(value)
+                elif kind == 'log':
+                    self._log(value)
+                elif kind == 'done':
+                    # The host already sent the last data hook
+                    self._ret_code = value
+                    break
+        except (EOFError, OSError):
+            # The host was killed by stop() or crashed
+            host.broken = True
+
+            if self._stopped:
+                self._set_retcode(self.STOPPED)
+            else:
+                self._log('ERROR: youtube-dl host process exited unexpectedly')
+                self._set_retcode(self.ERROR)
+
+            self._last_data_hook()
+        finally:
+            self._host = None
+            self._pool.release(host)
+
+        return self._ret_code
+
+    def stop(self):
+        # Stop the download process and set return code to stopped
+        #
+        host = self._host
+
+        if host is not None:
+            self._stopped = True
+            host.kill()
+
+    def close(self):
+        pass
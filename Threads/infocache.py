@@ -0,0 +1,226 @@
+# This Python file uses the following encoding: utf-8
+""" YoutubeDlg module for caching the video info youtube-dl extracts.
+
+youtube-dl writes the info of a video with --write-info-json and can
+download from such a file with --load-info-json, skipping the page
+download & extraction. InfoCache keeps these files on disk keyed by the
+canonical url of the video (see canonical.canonical_url()), so a retried
+or re-queued item starts downloading at once.
+
+Attributes:
+    INFO_JSON_FLAG (string): youtube-dl switch that writes the info file.
+
+    LOAD_INFO_FLAG (string): youtube-dl switch that reads the info file.
+
+Notes:
+    The media urls in the info of most sites expire after a few hours,
+    so the entries live for a short TTL and the entry of a download that
+    failed with a cached info is discarded.
+
+"""
+
+import os
+import time
+import shutil
+import hashlib
+
+from threading import Lock
+
+from .canonical import (
+    canonical_url,
+    video_key,
+)
+from .utility_helper import check_path
+
+INFO_JSON_FLAG = '--write-info-json'
+LOAD_INFO_FLAG = '--load-info-json'
+
+
+class InfoCache(object):
+    """
+    On-disk cache of youtube-dl info json files with TTL & LRU eviction.
+
+    Every entry is one '<sha1 of the canonical url>.info.json' file, its
+    modification time is the time it was stored (for the TTL) and its
+    access time the time it was last used (for the LRU eviction), both
+    set explicitly.
+
+    Args:
+        directory (string): Absolute path of the cache directory.
+
+        ttl (int): Seconds an entry stays valid.
+
+        max_size (int): Max total size (bytes) of the entries, the least
+            recently used ones are removed above it.
+
+    """
+
+    SUFFIX = '.info.json'
+
+    def __init__(self, directory, ttl, max_size):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._lock = Lock()
+
+    def lookup(self, url):
+        """Return the path of the valid cached info of url or None."""
+        path = self._path(url)
+
+        with self._lock:
+            try:
+                stored = os.path.getmtime(path)
+            except OSError:
+                return None
+
+            now = time.time()
+
+            if now - stored > self.ttl:
+                self._remove(path)
+                return None
+
+            # Mark the entry as recently used
+            os.utime(path, (now, stored))
+
+        return path
+
+    def store(self, url, info_file, move=False):
+        # Add the info file youtube-dl wrote for url to the cache.
+        # With move the file is moved instead of copied
+        #
+        path = self._path(url)
+        partial = path + '.part'
+
+        with self._lock:
+            try:
+                check_path(self.directory)
+
+                if move:
+                    shutil.move(info_file, partial)
+                else:
+                    shutil.copyfile(info_file, partial)
+
+                os.replace(partial, path)
+
+                now = time.time()
+                os.utime(path, (now, now))
+            except (IOError, OSError):
+                return
+
+            self._evict()
+
+    def discard(self, url):
+        with self._lock:
+            self._remove(self._path(url))
+
+    def accepts(self, url):
+        """Return True if the downloads of url can use the cache.
+
+        Only the urls of a single known video (see canonical.video_key())
+        do, a url of any other site may be a list with one info file per
+        entry.
+        """
+        return video_key(url) is not None
+
+    def prepare(self, url, options):
+        """Return the youtube-dl options of a download of url.
+
+        Args:
+            url (string): Url of the download.
+
+            options (tuple): youtube-dl options of the download.
+
+        Ret:
+            (options, cached) tuple. With a cached info the options load it
+            with LOAD_INFO_FLAG and cached is True, else they make youtube-dl
+            write the info (INFO_JSON_FLAG) so finish() can store it.
+
+        """
+        cached = self.lookup(url)
+
+        if cached is not None:
+            return tuple(options) + (LOAD_INFO_FLAG, cached), True
+
+        if INFO_JSON_FLAG in options:
+            return options, False
+
+        return tuple(options) + (INFO_JSON_FLAG,), False
+
+    def finish(self, url, options, cached, info_files, success):
+        """Update the cache after a download prepared by prepare().
+
+        Args:
+            url (string): Url of the download.
+
+            options (tuple): youtube-dl options before prepare().
+
+            cached (boolean): Second item returned by prepare().
+
+            info_files (list): Paths of the info files youtube-dl wrote
+                (the 'info_json' key of the extract_data() dicts).
+
+            success (boolean): True if the download did not fail.
+
+        """
+        if cached:
+            if not success:
+                # The cached media urls may have expired
+                self.discard(url)
+
+            return
+
+        # Keep the user's info files if the options asked for them
+        added = INFO_JSON_FLAG not in options
+
+        if len(info_files) == 1 and os.path.exists(info_files[0]):
+            self.store(url, info_files[0], move=added)
+        elif added:
+            # Do not leave the files only the cache asked for
+            for info_file in info_files:
+                self._remove(info_file)
+
+    def _path(self, url):
+        digest = hashlib.sha1(canonical_url(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + self.SUFFIX)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        # Remove the least recently used entries over max_size,
+        # the caller holds the lock
+        #
+        entries = []
+        total = 0
+
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+
+        for name in names:
+            if not name.endswith(self.SUFFIX):
+                continue
+
+            path = os.path.join(self.directory, name)
+
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            entries.append((stat.st_atime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+
+            self._remove(path)
+            total -= size
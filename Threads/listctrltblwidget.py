@@ -34,12 +34,6 @@ class ListCtrlTblWidget(QTableWidget):
         'status':    (6, STATUS_LABEL, 108, True),
     }
 
-    #+++++<HUUANH_DEBUG>
-    format = "%(asctime)s: %(message)s"
-    logging.basicConfig(format=format, level=logging.INFO, datefmt='%H:%M:%S')
-    logging.getLogger().setLevel(logging.DEBUG)
-    #-----<HUUANH_DEBUG>
-
     def __init__(self, columns, *args, **kwargs):
         super(ListCtrlTblWidget, self).__init__(*args, **kwargs)
 
@@ -2,6 +2,14 @@
 
 from os import error
 import os.path
+import io
+import csv
+import json
+import gzip
+import glob
+import queue
+import shutil
+from threading import Thread, Event, Lock
 from time import sleep, strftime
 
 from .utility_helper import (
@@ -9,6 +17,26 @@ from .utility_helper import (
     check_path
 )
 
+def _level_of(message):
+    # Level of a youtube-dl message from its 'ERROR:' or 'WARNING:' prefix
+    #
+    prefix = message.split(':', 1)[0]
+
+    if prefix in ('ERROR', 'WARNING'):
+        return prefix
+
+    return 'INFO'
+
+
+def _csv_line(row):
+    # Return the row as one csv line
+    #
+    line = io.StringIO()
+    csv.writer(line, lineterminator='\n').writerow(row)
+
+    return line.getvalue()
+
+
 class LogManager(object):
 
     """
@@ -17,37 +45,211 @@ class LogManager(object):
     Attributes:
         LOG_FILENAME (string): File name of the log.
         TIME_TEMPLATE (string): Custom template to log the time.
-        MAX_LOGSIZE (int): Maximum size (bytes) of the log file
+        MAX_LOGSIZE (int): Default size (bytes) the log file rotates at.
+        BACKUP_COUNT (int): Default number of compressed logs kept.
+        LOG_FORMATS (tuple): Valid log_format values.
+        FIELDS (tuple): Fields of a log record ('jsonl' keys, 'csv' columns).
+        INDEX_SUFFIX (string): Suffix of the sidecar index of the log file.
 
     ArgsL
         config_path (string): Absolte the path where Logmanager shoult
         store the log file.
         add_time (boolean): If True Logmanager will also log the time.
+        flush_interval (int): Milliseconds the writer thread collects
+            messages before it writes them to the file in one batch.
+        max_size (int): Size (bytes) the log file rotates at, zero disables
+            the rotation.
+        backup_count (int): Number of rotated logs kept, gzip compressed
+            as LOG_FILENAME.1.gz (newest) ... LOG_FILENAME.<backup_count>.gz
+        log_format (string): 'text' writes the message (and the time if
+            add_time), 'jsonl' writes every record as a JSON object and 'csv'
+            as a row of FIELDS.
+
+    Notes:
+        OutputLog() only puts the message in a queue, a background writer
+        thread appends the queued messages to the log file. Use flush()
+        to wait until everything logged so far is on disk and close()
+        on shutdown.
+
+        On rotation the writer only renames the full log and starts a new
+        one, the LogArchiver thread compresses it & shifts the old ones.
+
+        The writer also appends '<offset> <object_id> <url>' (tab separated)
+        to the sidecar index for every record of an item, records_for()
+        uses it to read the records of one item without scanning the log.
+        The index covers the current log file only.
 
     """
     LOG_FILENAME    = 'ytblog1000.csv'
     TIME_TEMPLATE   = '[{time}] {message}'
     #TIME_TEMPLATE   = "%(asctime)s: %(message)s"
     MAX_LOGSIZE     = 524288 #bytes ~0.5Mb
-    LOG_FILEPATH    = 'D:/QtProject/YoutubeDLGui/'
+    BACKUP_COUNT    = 5
+    LOG_FORMATS     = ('text', 'jsonl', 'csv')
+    FIELDS          = ('timestamp', 'object_id', 'url', 'level', 'stage', 'message')
+    INDEX_SUFFIX    = '.idx'
 
-    def __init__(self, config_path, add_time=False):
-        self.config_path = self.LOG_FILEPATH
+    def __init__(self, config_path, add_time=False, flush_interval=500,
+                 max_size=MAX_LOGSIZE, backup_count=BACKUP_COUNT, log_format='text'):
+        self.config_path = config_path
         self.add_time = add_time
+        self.flush_interval = flush_interval / 1000.0
+        self.max_size = max_size
+        self.backup_count = backup_count
+        self.log_format = log_format
         self.log_file = os.path.join(self.config_path, self.LOG_FILENAME)
+        self.index_file = self.log_file + self.INDEX_SUFFIX
         self._encoding = get_encoding()
+
+        # object_id & url -> offsets of their records, loaded from the
+        # index file on the first records_for() call
+        self._index_lock = Lock()
+        self._index_ids = None
+        self._index_urls = None
+
+        # Rotated logs waiting to be compressed, None stops the archiver
+        self._archive_queue = queue.Queue()
+        self._rotations = 0
+
         self._init_log()
         self._auto_clear_log()
+        self._size = self._log_size()
 
-        
+        self._archiver = Thread(target=self._run_archiver, name='LogArchiver', daemon=True)
+        self._archiver.start()
+
+        # Messages waiting for the writer thread. An Event in the queue is a
+        # flush() request and None asks the writer to stop
+        self._queue = queue.Queue()
+        self._wakeup = Event()
+
+        self._writer = Thread(target=self._run_writer, name='LogWriter', daemon=True)
+        self._writer.start()
 
     def OutputLog(self, data):
         # Log data to the file
         # Args: 
         #   data (string): string to write the log file
         # 
-        if isinstance(data, str):
-            self._write(data + '\n', 'a')         
+        self.log_record(data)
+
+    def log_record(self, message, object_id=None, url=None, stage=None, level=None):
+        """Log a message of a download item.
+
+        Args:
+            message (string): String to write to the log file.
+            object_id (int): object_id of the item the message is about.
+            url (string): Url of the item.
+            stage (string): Download status of the item (e.g. 'Downloading').
+            level (string): 'ERROR', 'WARNING' or 'INFO', guessed from the
+                youtube-dl message prefix if not given.
+
+        """
+        if not isinstance(message, str):
+            return
+
+        if level is None:
+            level = _level_of(message)
+
+        # Time of the message, not of the write
+        if self.log_format != 'text':
+            timestamp = strftime('%Y-%m-%d %H:%M:%S')
+        elif self.add_time:
+            timestamp = strftime('%c')
+        else:
+            timestamp = None
+
+        self._queue.put((timestamp, object_id, url, level, stage, message))
+
+    def records_for(self, object_id=None, url=None):
+        """Return the lines of the current log file about one item.
+
+        Args:
+            object_id (int): object_id of the item.
+            url (string): Url of the item, used if object_id is None.
+
+        Ret:
+            python list with the log lines (strings) in the log order.
+
+        """
+        self.flush()
+
+        with self._index_lock:
+            self._load_index()
+
+            if object_id is not None:
+                offsets = self._index_ids.get(str(object_id), [])
+            else:
+                offsets = self._index_urls.get(url, [])
+
+            lines = []
+
+            if offsets:
+                with open(self.log_file, 'rb') as log:
+                    for offset in offsets:
+                        log.seek(offset)
+                        lines.append(log.readline().decode(self._encoding, 'ignore').rstrip('\r\n'))
+
+        return lines
+
+    def flush(self, timeout=None):
+        # Block until the messages logged so far are written to the file
+        #
+        if not self._writer.is_alive():
+            return
+
+        done = Event()
+        self._queue.put(done)
+        self._wakeup.set()
+        done.wait(timeout)
+
+    def close(self):
+        # Write the queued messages and stop the writer & archiver threads
+        #
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._wakeup.set()
+            self._writer.join()
+
+        if self._archiver.is_alive():
+            self._archive_queue.put(None)
+            self._archiver.join()
+
+    def _run_writer(self):
+        running = True
+
+        while running:
+            batch = [self._queue.get()]
+
+            # Give the other messages time to come, unless someone waits
+            if self.flush_interval > 0 and isinstance(batch[0], tuple):
+                self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [item for item in batch if isinstance(item, tuple)]
+
+            if records:
+                try:
+                    self._write_records(records)
+                    self._size = self._log_size()
+
+                    if self.max_size and self._size >= self.max_size:
+                        self._rotate()
+                except (IOError, OSError):
+                    # Keep the writer alive, flush() & close() wait on it
+                    pass
+
+            for item in batch:
+                if item is None:
+                    running = False
+                elif isinstance(item, Event):
+                    item.set()
 
     def _write(self, data, mode):
         """Write data to the log file.
@@ -59,21 +261,89 @@ class LogManager(object):
             mode (string): Can be any IO mode supported by python.
 
         """ 
-        check_path(self.LOG_FILEPATH)
-
         with open(self.log_file, mode) as log:
             try:
-                if mode == 'a' and self.add_time:
-                    msg = self.TIME_TEMPLATE.format(time=strftime('%c'), message=data)
-                else:
-                    msg = data
-
-                log.write(msg)
+                log.write(data)
                 #log.write(msg.encode(self._encoding, 'ignore'))
             except:
                 pass
                 #QMessageBox.information(self, 'SelectIndexes()', strLog)
 
+    def _write_records(self, records):
+        # Append the records to the log file and their offsets to the index
+        #
+        lines = []
+        entries = []
+        offset = self._size
+
+        for record in records:
+            line = self._format(record).encode(self._encoding, 'ignore')
+            object_id, url = record[1], record[2]
+
+            if object_id is not None or url:
+                entries.append((offset, '' if object_id is None else str(object_id), url or ''))
+
+            lines.append(line)
+            offset += len(line)
+
+        with open(self.log_file, 'ab') as log:
+            log.write(b''.join(lines))
+
+        if entries:
+            with self._index_lock:
+                with open(self.index_file, 'a', encoding='utf-8') as index:
+                    index.write(''.join('{0}\t{1}\t{2}\n'.format(*entry) for entry in entries))
+
+                if self._index_ids is not None:
+                    for entry in entries:
+                        self._add_to_index(*entry)
+
+    def _format(self, record):
+        # Return the log line of the record
+        #
+        if self.log_format == 'jsonl':
+            return json.dumps(dict(zip(self.FIELDS, record)), ensure_ascii=False) + '\n'
+
+        if self.log_format == 'csv':
+            return _csv_line(record)
+
+        timestamp, message = record[0], record[-1]
+
+        if timestamp is not None:
+            message = self.TIME_TEMPLATE.format(time=timestamp, message=message)
+
+        return message + '\n'
+
+    def _load_index(self):
+        # Read the index file, the caller holds the _index_lock
+        #
+        if self._index_ids is not None:
+            return
+
+        self._index_ids = {}
+        self._index_urls = {}
+
+        if not os.path.exists(self.index_file):
+            return
+
+        log_size = self._log_size()
+
+        with open(self.index_file, encoding='utf-8') as index:
+            for entry in index:
+                offset, object_id, url = entry.rstrip('\n').split('\t', 2)
+                offset = int(offset)
+
+                # Stale entry, the log was cleared without its index
+                if offset < log_size:
+                    self._add_to_index(offset, object_id, url)
+
+    def _add_to_index(self, offset, object_id, url):
+        if object_id:
+            self._index_ids.setdefault(object_id, []).append(offset)
+
+        if url:
+            self._index_urls.setdefault(url, []).append(offset)
+
     def _log_size(self):
         # Return log file size in Bytes
         #
@@ -82,19 +352,93 @@ class LogManager(object):
         
         return os.path.getsize(self.log_file)
 
+    def _header(self):
+        # Return the first line of a new log file
+        #
+        if self.log_format == 'csv':
+            return _csv_line(self.FIELDS)
+
+        return ''
+
     def _clear(self):
-        # Clear log file.
+        # Clear log file and its index, the caller holds the _index_lock
         #
-        self._write('', 'w')
+        self._write(self._header(), 'w')
+
+        if os.path.exists(self.index_file):
+            os.remove(self.index_file)
+
+        if self._index_ids is not None:
+            self._index_ids = {}
+            self._index_urls = {}
 
     def _init_log(self):
         # Initialize the log file if not exist.
         #
+        check_path(self.config_path)
+
         if not os.path.exists(self.log_file):
-            self._write('', 'w')
+            self._write(self._header(), 'w')
 
     def _auto_clear_log(self):
-        # Clear the log file
+        # Rotate the log file if it is already full and archive the
+        # rotated logs an earlier run did not compress
+        #
+        leftovers = glob.glob(glob.escape(self.log_file) + '.*.rotated')
+
+        for pending in sorted(leftovers, key=os.path.getmtime):
+            self._archive_queue.put(pending)
+
+        if self.max_size and self._log_size() >= self.max_size:
+            self._rotate()
+
+    def _rotate(self):
+        # Move the full log aside and start a new one. Runs on the writer
+        # thread (or in __init__), the slow part is left to the archiver
+        #
+        self._rotations += 1
+        rotated = '{0}.{1}.{2}.rotated'.format(self.log_file, os.getpid(), self._rotations)
+
+        # records_for() must not read the index of one file & the other
+        with self._index_lock:
+            os.replace(self.log_file, rotated)
+            self._clear()
+
+        # The index offsets count the header of the new file
+        self._size = self._log_size()
+
+        self._archive_queue.put(rotated)
+
+    def _run_archiver(self):
+        while True:
+            rotated = self._archive_queue.get()
+
+            if rotated is None:
+                break
+
+            try:
+                self._archive(rotated)
+            except (IOError, OSError):
+                pass
+
+    def _archive(self, rotated):
+        # Shift LOG_FILENAME.<n>.gz to .<n + 1>.gz, drop the ones over
+        # backup_count & compress the rotated log as LOG_FILENAME.1.gz
         #
-        if self.log_file > self.LOG_FILENAME:
-            self._clear()
\ No newline at end of file
+        if self.backup_count < 1:
+            os.remove(rotated)
+            return
+
+        for number in range(self.backup_count - 1, 0, -1):
+            source = '{0}.{1}.gz'.format(self.log_file, number)
+
+            if os.path.exists(source):
+                os.replace(source, '{0}.{1}.gz'.format(self.log_file, number + 1))
+
+        partial = '{0}.1.gz.part'.format(self.log_file)
+
+        with open(rotated, 'rb') as source, gzip.open(partial, 'wb') as target:
+            shutil.copyfileobj(source, target)
+
+        os.replace(partial, '{0}.1.gz'.format(self.log_file))
+        os.remove(rotated)
\ No newline at end of file
@@ -33,10 +33,6 @@ class OptionsManager(object):
     SETTINGS_FILENAME = 'settings.json'
     SENSITIVE_KEYS = ('sudo_password', 'password', 'video_password')    
 
-    format = "%(asctime)s: %(message)s"
-    logging.basicConfig(format=format, level=logging.INFO, datefmt='%H:%M:%S')
-    logging.getLogger().setLevel(logging.DEBUG)
-
 
     def __init__(self, config_path):
         self.config_path = config_path
@@ -136,6 +132,19 @@ class OptionsManager(object):
             'write_thumbnail' (boolean): If True youtube-dl will write a 
                 thumbnail image to disk.
 
+            'download_archive' (string): Absolute path of the youtube-dl
+                --download-archive file, empty to disable it. The download
+                managers complete the items already in it without starting
+                youtube-dl, see archive.DownloadArchive.
+
+            'info_cache_ttl' (int): Seconds the video info youtube-dl extracted
+                is reused by the next downloads of the same video (retries,
+                re-queued items) with --load-info-json, zero disables the
+                cache. See infocache.InfoCache.
+
+            'info_cache_size' (int): Max size in bytes of the video info cache
+                under the config path.
+
             'retries' (int): Number of youtube-dl retries.
 
             'user_agent' (string): Specify a custom user agent for youtube-dl
@@ -163,6 +172,14 @@ class OptionsManager(object):
                 youtube-dl if not exists so you should make sure you have write access 
                 if you want to update the youtube-dl binary from within youtube-dlg.
 
+            'option_profiles' (dict): Named option profiles, every profile is a
+                dict with the option values that replace the current ones
+                (ex: {'audio': {'to_audio': True, 'audio_format': 'mp3'}}).
+                See parsers.OptionsParser.parse().
+
+            'active_profile' (string): Name of the profile of the urls added
+                to the download list, empty for the current options.
+
             'cmd_args' (string): String that contains extra youtube-dl options 
                 seperated by spaces.
 
@@ -171,9 +188,56 @@ class OptionsManager(object):
 
             'log_time' (boolean): See logmanager.LogManager add_time attribute.
 
+            'log_flush_interval' (int): Milliseconds the log writer thread collects
+                messages before it writes them in one batch, see
+                logmanager.LogManager flush_interval. Zero writes them as soon as
+                the writer gets them.
+
+            'log_max_size' (int): Size in bytes the log file is rotated at, zero
+                disables the rotation. See logmanager.LogManager max_size.
+
+            'log_backups' (int): Number of gzip compressed rotated logs kept
+                in the config path.
+
+            'log_format' (string): values are: 'text' (the youtube-dl messages),
+                'jsonl' or 'csv' (records with the time, object_id, url, level,
+                stage & message). See logmanager.LogManager log_format.
+
             'workers_number' (int): Number of download workers that download manager 
                 will spawn. Must be greater than zero.
 
+            'event_dispatch' (boolean): When True the download manager hands the
+                queued items to the workers as soon as an item is queued or a worker
+                becomes free, instead of polling the download list every WAIT_TIME.
+
+            'download_engine' (string): How the workers run youtube-dl.
+                values are: 'subprocess' (one youtube-dl process per URL),
+                'inprocess' (youtube_dl module imported once and run inside
+                the youtube-dlg process, falls back to 'subprocess' when
+                youtube_dl is not installed), 'pool' (like 'inprocess' but on a
+                pool of long-lived youtube-dl host processes, one per worker).
+
+            'host_max_jobs' (int): Number of downloads after which a 'pool' host
+                process is replaced by a fresh one. Zero means never.
+
+            'max_per_host' (int): Max number of concurrent downloads from the
+                same host (see scheduler.host_of()). Zero means no limit.
+
+            'bandwidth_limit' (int): Total download bandwidth of all the workers
+                in bytes per second. Zero means no limit.
+
+            'expand_playlists' (boolean): When True playlist & channel urls are
+                resolved (flat extraction) into one item per video before the
+                download, so the videos are downloaded by all the workers.
+
+            'manager_mode' (string): values are: 'threads' (DownloadManager with
+                'workers_number' Worker threads) or 'asyncio' (AsyncDownloadManager,
+                all the youtube-dl processes driven by one event loop and up to
+                'workers_number' concurrent downloads).
+
+            'progress_refresh_rate' (int): Number of times per second the main
+                window redraws the items updated by the download process.
+
             'locale_name' (string): Locale name (en_US)
 
             'main_win_size' (tuple): Main window size (width x height).
@@ -252,6 +316,9 @@ class OptionsManager(object):
             'write_description': False,
             'write_info': False,
             'write_thumbnail': False,
+            'download_archive': '',
+            'info_cache_ttl': 0,
+            'info_cache_size': 67108864,
             'retries': 10,
             'user_agent': '',
             'referer': '',
@@ -262,10 +329,24 @@ class OptionsManager(object):
             'password': '',
             'video_password': '',
             'youtubedl_path': self.config_path,
+            'option_profiles': {},
+            'active_profile': '',
             'cmd_args': '',
             'enable_log': True,
             'log_time': True,
+            'log_flush_interval': 500,
+            'log_max_size': 524288,
+            'log_backups': 5,
+            'log_format': 'text',
             'workers_number': 3,
+            'event_dispatch': True,
+            'download_engine': 'subprocess',
+            'host_max_jobs': 50,
+            'manager_mode': 'threads',
+            'max_per_host': 0,
+            'bandwidth_limit': 0,
+            'expand_playlists': True,
+            'progress_refresh_rate': 10,
             'locale_name': 'en_US',
             'main_win_size': (740, 490),
             'opts_win_size': (640, 490),
@@ -334,6 +415,12 @@ class OptionsManager(object):
 
         VALID_SUB_LANGUAGE = ('en', 'el', 'pt', 'fr', 'it', 'ru', 'es', 'de', 'he', 'sv', 'tr')
 
+        VALID_DOWNLOAD_ENGINE = ('subprocess', 'inprocess', 'pool')
+
+        VALID_MANAGER_MODE = ('threads', 'asyncio')
+
+        VALID_LOG_FORMAT = ('text', 'jsonl', 'csv')
+
         MIN_FRAME_SIZE = 100
 
         for key in self.options:
@@ -352,7 +439,10 @@ class OptionsManager(object):
             'output_format': OUTPUT_FORMATS.keys(),
             'min_filesize_unit': VALID_FILESIZE_UNIT,
             'max_filesize_unit': VALID_FILESIZE_UNIT,
-            'subs_lang': VALID_SUB_LANGUAGE
+            'subs_lang': VALID_SUB_LANGUAGE,
+            'download_engine': VALID_DOWNLOAD_ENGINE,
+            'manager_mode': VALID_MANAGER_MODE,
+            'log_format': VALID_LOG_FORMAT
         }
 
         for key, valid_list in rules_dict.items():
@@ -362,8 +452,52 @@ class OptionsManager(object):
         if settings_dict['workers_number'] < 1:
             return False
 
+        if settings_dict['host_max_jobs'] < 0:
+            return False
+
+        if settings_dict['max_per_host'] < 0 or settings_dict['bandwidth_limit'] < 0:
+            return False
+
+        if not 0 <= settings_dict['log_flush_interval'] <= 60000:
+            return False
+
+        if settings_dict['log_max_size'] < 0 or settings_dict['log_backups'] < 0:
+            return False
+
+        if settings_dict['info_cache_ttl'] < 0 or settings_dict['info_cache_size'] < 0:
+            return False
+
+        if not 1 <= settings_dict['progress_refresh_rate'] <= 1000:
+            return False
+
+        for profile in settings_dict['option_profiles'].values():
+            if not isinstance(profile, dict):
+                return False
+
+            if any(key not in self.options or key == 'option_profiles' for key in profile):
+                return False
+
+            # A value of another type breaks OptionsParser.parse()
+            if any(not self._same_type(value, self.options[key]) for key, value in profile.items()):
+                return False
+
+        active_profile = settings_dict['active_profile']
+        if active_profile and active_profile not in settings_dict['option_profiles']:
+            return False
+
         return True
 
+    def _same_type(self, value, default):
+        # True if value can replace the default option value
+        #
+        if isinstance(default, bool):
+            return isinstance(value, bool)
+
+        if isinstance(default, float):
+            return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+        return isinstance(value, type(default))
+
     def _get_options(self):
         """
         Return options dictionary.
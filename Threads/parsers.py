@@ -3,6 +3,7 @@
 import os.path
 
 from sys import flags
+from collections import OrderedDict
 from .utility_helper import (
     remove_shortcut, 
     to_string
@@ -56,14 +57,37 @@ class OptionHolder(object):
 
         return any([options_dict[req]] for req in self.requirements)
 
+def _hashable(value):
+    # Lists (e.g. from settings.json) become tuples
+    #
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+
+    return value
+
+
 class OptionsParser(object):
     """
     Parse optionsmanager.OptionsManager options.
 
     This class is responsible for turning some of the youtube-dlg options
     to youtube-dl command line options.
+
+    The compiled options are cached by a fingerprint of the option values
+    the parser reads, so parsing the same options again (e.g. for every
+    url of a bulk add) costs one dict lookup and returns the same tuple.
+
+    Attributes:
+        CACHE_SIZE (int): Max number of compiled option sets kept.
+        EXTRA_OPTIONS (tuple): Options read by the parser besides the ones
+            of the OptionHolders.
     """
 
+    CACHE_SIZE = 32
+
+    EXTRA_OPTIONS = ('output_format', 'output_template', 'second_video_format',
+                     'min_filesize_unit', 'max_filesize_unit', 'cmd_args')
+
     def __init__(self):
         self._ydl_options = [
             OptionHolder('playlist_start', '--playlist-start', 1),
@@ -80,6 +104,7 @@ class OptionsParser(object):
             OptionHolder('write_description', '--write-description', False),
             OptionHolder('write_info', '--write-info-json', False),
             OptionHolder('write_thumbnail', '--write-thumbnail', False),
+            OptionHolder('download_archive', '--download-archive', ''),
             OptionHolder('min_filesize', '--min-filesize', 0),
             OptionHolder('max_filesize', '--max-filesize', 0),
             OptionHolder('write_all_subs', '--all-subs', False),
@@ -101,18 +126,59 @@ class OptionsParser(object):
             OptionHolder('embed_thumbnail', '--embed-thumbnail', False),
             OptionHolder('add_metadata', '--add-metadata', False)
         ]
-    
-    def parse(self, options_dictionary):
+
+        # Names of the options the compiled options depend on
+        names = set(self.EXTRA_OPTIONS)
+
+        for opt in self._ydl_options:
+            names.add(opt.name)
+            names.update(opt.requirements or ())
+
+        self._fingerprint_names = tuple(sorted(names))
+
+        # fingerprint -> compiled options (tuple), least recently used first
+        self._cache = OrderedDict()
+
+    def parse(self, options_dictionary, profile=None):
         """
         Parses the given options to youtube-dl command line arguments.
 
         Args:
             options_dictionary (dict): Dictionary with all the options.
 
+            profile (string): Optional name of an option profile of the
+                'option_profiles' option. Its values replace the ones of
+                options_dictionary.
+
         return:
-            List of strings with all the youtube-dl command line options.
+            Tuple of strings with all the youtube-dl command line options.
         """
+        if profile:
+            options_dictionary = dict(options_dictionary)
+            options_dictionary.update(options_dictionary['option_profiles'][profile])
 
+        key = self.fingerprint(options_dictionary)
+        options = self._cache.get(key)
+
+        if options is None:
+            options = tuple(self._parse(options_dictionary))
+            self._cache[key] = options
+
+            if len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+
+        return options
+
+    def fingerprint(self, options_dictionary):
+        # Return a hashable key of the option values parse() depends on
+        #
+        return tuple(_hashable(options_dictionary[name]) for name in self._fingerprint_names)
+
+    def _parse(self, options_dictionary):
+        # Compile the options, see parse()
+        #
         options_list = ['--newline']
 
         # Create a copy of options_dictionary
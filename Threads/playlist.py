@@ -0,0 +1,172 @@
+# This Python file uses the following encoding: utf-8
+""" YoutubeDlg module for expanding playlists into single videos.
+
+A playlist (or channel) URL is resolved with a flat extraction, which
+only reads the playlist pages, into the URLs of its entries. Each entry
+then becomes its own DownloadItem so the entries are downloaded by all
+the workers instead of one worker downloading them one after the other.
+
+Attributes:
+    PASSTHROUGH_FLAGS (tuple): youtube-dl options (with a value) of the
+        parent item that also apply to the flat extraction.
+
+    EXTRACT_TIMEOUT (int): Time in seconds to wait for the flat extraction.
+
+"""
+
+import os
+import json
+import subprocess
+
+from urllib.parse import (
+    urlparse,
+    parse_qs,
+)
+
+from .utility_helper import get_encoding
+
+from .downloader import get_command
+
+PASSTHROUGH_FLAGS = (
+    '--playlist-start',
+    '--playlist-end',
+    '-u',
+    '-p',
+    '--proxy',
+)
+
+EXTRACT_TIMEOUT = 300
+
+_YOUTUBE_HOSTS = ('youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com', 'youtu.be')
+
+_YOUTUBE_LIST_PATHS = ('/playlist', '/channel/', '/c/', '/user/', '/@')
+
+
+def is_playlist_url(url):
+    """Return True if the url is a playlist or channel url we can expand.
+
+    Only the known YouTube shapes are recognized, other urls are
+    downloaded as a single item.
+    """
+    parsed = urlparse(url)
+
+    if (parsed.hostname or '').lower() not in _YOUTUBE_HOSTS:
+        return False
+
+    if 'list' in parse_qs(parsed.query):
+        return True
+
+    return parsed.path.startswith(_YOUTUBE_LIST_PATHS)
+
+
+def entry_url(entry):
+    """Return the url of a flat playlist entry or None."""
+    url = entry.get('url') or entry.get('webpage_url')
+
+    if url and '://' in url:
+        return url
+
+    if entry.get('ie_key') == 'Youtube' and entry.get('id'):
+        return 'https://www.youtube.com/watch?v=' + entry['id']
+
+    return None
+
+
+def expand_playlist(youtubedl_path, url, options, in_process=False):
+    """Resolve the playlist url into the urls of its entries.
+
+    Args:
+        youtubedl_path (string): Absolute path to youtube-dl binary.
+
+        url (string): Playlist url.
+
+        options (list): youtube-dl options of the playlist item.
+
+        in_process (boolean): If True use the youtube_dl module instead
+            of a youtube-dl process, when the module is installed.
+
+    Ret:
+        List with the entries urls or None if the url is not a playlist
+        or it could not be expanded (the caller should then download the
+        url as a single item).
+
+    """
+    passthrough = []
+
+    for index, flag in enumerate(options[:-1]):
+        if flag in PASSTHROUGH_FLAGS:
+            passthrough += [flag, options[index + 1]]
+
+    if in_process and _can_extract_in_process():
+        info = _extract_in_process(url, passthrough)
+    else:
+        info = _extract_subprocess(youtubedl_path, url, passthrough)
+
+    if not info or info.get('_type') != 'playlist':
+        return None
+
+    urls = []
+
+    for entry in info.get('entries') or []:
+        if entry is None:
+            continue
+
+        child_url = entry_url(entry)
+
+        if child_url is None:
+            return None
+
+        urls.append(child_url)
+
+    return urls
+
+
+def _extract_subprocess(youtubedl_path, url, passthrough):
+    cmd = get_command(youtubedl_path, url, ['--flat-playlist', '-J', '--ignore-config'] + passthrough)
+
+    info = None
+    if os.name == 'nt':
+        # Hide subprocess window
+        info = subprocess.STARTUPINFO()
+        info.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+    try:
+        proc = subprocess.run(cmd,
+                              stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL,
+                              startupinfo=info,
+                              timeout=EXTRACT_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+    if proc.returncode != 0:
+        return None
+
+    try:
+        return json.loads(proc.stdout.decode(get_encoding(), 'ignore'))
+    except ValueError:
+        return None
+
+
+def _can_extract_in_process():
+    from .ytdlhost import load_youtube_dl
+
+    return load_youtube_dl() is not None
+
+
+def _extract_in_process(url, passthrough):
+    from .ytdlhost import build_params, load_youtube_dl
+
+    youtube_dl = load_youtube_dl()
+    params = build_params(passthrough)
+
+    if youtube_dl is None or params is None:
+        return None
+
+    params.update(extract_flat='in_playlist', quiet=True, no_warnings=True)
+
+    try:
+        with youtube_dl.YoutubeDL(params) as ydl:
+            return ydl.extract_info(url, download=False)
+    except Exception:
+        return None
@@ -0,0 +1,44 @@
+# This Python file uses the following encoding: utf-8
+""" YoutubeDlg module for passing the download progress to the GUI.
+
+The workers update the DownloadItem as soon as youtube-dl reports
+something and post the item's object_id on the ProgressBus. The GUI
+drains the bus on a timer and redraws every changed item once, with its
+latest state, however many lines youtube-dl printed in between.
+
+"""
+
+from threading import Lock
+
+
+class ProgressBus(object):
+    """
+    Set of the items updated since the last drain, in update order.
+
+    post() never waits on the GUI, it only takes the bus lock to add
+    the object_id to the set.
+
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+
+        # object_id -> None, a dict keeps the order of the first update
+        self._dirty = {}
+
+    def post(self, object_id):
+        # Mark the item with the given object_id as updated
+        #
+        with self._lock:
+            self._dirty[object_id] = None
+
+    def drain(self):
+        # Return the object_ids updated since the last drain
+        #
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+
+        return list(dirty)
+
+    def __len__(self):
+        return len(self._dirty)
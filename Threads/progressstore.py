@@ -0,0 +1,221 @@
+# This Python file uses the following encoding: utf-8
+""" YoutubeDlg module for the numeric progress of the download items.
+
+DownloadItem.progress_stats keeps the display strings youtube-dl prints.
+ProgressStore keeps the same values as numbers in one array per column,
+parsed once when the item is updated. The store also keeps running
+per-stage counters and running sums over the active items, updated on
+every stage change & progress update, so the whole-queue statistics cost
+the same whatever the length of the queue.
+
+Notes:
+    Every DownloadItem owns one slot (row) of the store while it is in a
+    DownloadList, see DownloadList.insert() & remove(). Freed slots are
+    reused by the next inserted items.
+
+"""
+
+from array import array
+
+from .utility_helper import (
+    to_bytes,
+    to_seconds,
+)
+
+
+def parse_percent(string):
+    """Convert a youtube-dl percent string ('12.3%') to float, 0.0 if unknown."""
+    try:
+        return float(string.rstrip('%'))
+    except ValueError:
+        return 0.0
+
+
+def parse_speed(string):
+    """Convert a youtube-dl speed string ('1.01MiB/s') to bytes per second."""
+    return to_bytes(string.split('/')[0])
+
+
+def parse_filesize(string):
+    """Convert a youtube-dl size string ('~4.30GiB') to bytes."""
+    return to_bytes(string.lstrip('~'))
+
+
+class ProgressStore(object):
+    """
+    Columnar store of the numeric progress of the download items.
+
+    Attributes:
+        FREE (int): Stage value of an unused slot.
+
+    Args:
+        stages (tuple): Main stages of the items (DownloadItem.STAGES).
+            A slot's stage is stored as its index in stages.
+
+    Columns (one array item per slot):
+        percent (float): Downloaded percentage of the current file.
+        speed (float): Download speed in bytes per second.
+        eta (float): ETA in seconds, -1 if unknown.
+        filesize (float): Size of the current file in bytes.
+
+    """
+
+    FREE = -1
+
+    def __init__(self, stages):
+        self._stage_index = {stage: index for index, stage in enumerate(stages)}
+
+        self.percent = array('d')
+        self.speed = array('d')
+        self.eta = array('d')
+        self.filesize = array('d')
+
+        self._stage = array('b')
+        self._free = []
+
+        # Number of slots in every stage
+        self._counts = [0] * len(stages)
+        self._active_index = self._stage_index['Active']
+
+        # Running sums over the 'Active' slots
+        self._percent_sum = 0.0
+        self._speed_sum = 0.0
+        self._filesize_sum = 0.0
+        self._downloaded_sum = 0.0
+
+    def __len__(self):
+        # Number of slots in use
+        #
+        return len(self._stage) - len(self._free)
+
+    def allocate(self, stage):
+        # Return a free slot in the given stage with zeroed columns
+        #
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._stage)
+
+            for column in (self.percent, self.speed, self.eta, self.filesize):
+                column.append(0.0)
+
+            self._stage.append(self.FREE)
+
+        self._clear(slot)
+        self.set_stage(slot, stage)
+
+        return slot
+
+    def free(self, slot):
+        self._leave_stage(slot)
+        self._clear(slot)
+        self._stage[slot] = self.FREE
+        self._free.append(slot)
+
+    def set_stage(self, slot, stage):
+        self._leave_stage(slot)
+
+        if stage == 'Queued':
+            # The download starts over
+            self._clear(slot)
+
+        index = self._stage_index[stage]
+
+        self._stage[slot] = index
+        self._counts[index] += 1
+
+        if index == self._active_index:
+            self._add_to_sums(slot, 1)
+
+    def update(self, slot, status_dict):
+        # Parse the progress values of a youtube-dl status dict
+        # (see downloader.extract_data) into the slot
+        #
+        active = self._stage[slot] == self._active_index
+
+        if active:
+            self._add_to_sums(slot, -1)
+
+        if 'percent' in status_dict:
+            self.percent[slot] = parse_percent(status_dict['percent'] or '')
+
+        if 'speed' in status_dict:
+            self.speed[slot] = parse_speed(status_dict['speed'] or '')
+
+        if 'eta' in status_dict:
+            self.eta[slot] = to_seconds(status_dict['eta'] or '')
+
+        if 'filesize' in status_dict:
+            self.filesize[slot] = parse_filesize(status_dict['filesize'] or '')
+
+        if active:
+            self._add_to_sums(slot, 1)
+
+    def stage_count(self, stage):
+        # Return the number of slots in the given stage
+        #
+        return self._counts[self._stage_index[stage]]
+
+    def total_percentage(self):
+        # Percentage of the whole queue: the active items count with their
+        # percent, the completed & failed ones with 100% and the rest with 0%
+        #
+        items_count = len(self)
+
+        if not items_count:
+            return 0.0
+
+        done = self.stage_count('Completed') + self.stage_count('Error')
+        total = self._percent_sum + done * 100.0
+
+        return total / items_count
+
+    def total_speed(self):
+        # Aggregate download speed of the active items in bytes per second
+        #
+        return _whole_bytes(self._speed_sum)
+
+    def remaining_bytes(self):
+        # Bytes left to download of the files the active items are on
+        #
+        return _whole_bytes(self._filesize_sum - self._downloaded_sum)
+
+    def _leave_stage(self, slot):
+        # Take the slot out of its current stage counter & sums
+        #
+        index = self._stage[slot]
+
+        if index == self.FREE:
+            return
+
+        self._counts[index] -= 1
+
+        if index == self._active_index:
+            self._add_to_sums(slot, -1)
+
+            if not self._counts[index]:
+                # Drop the rounding errors the running sums collected
+                self._percent_sum = self._speed_sum = 0.0
+                self._filesize_sum = self._downloaded_sum = 0.0
+
+    def _add_to_sums(self, slot, sign):
+        percent = self.percent[slot]
+        filesize = self.filesize[slot]
+
+        self._percent_sum += sign * percent
+        self._speed_sum += sign * self.speed[slot]
+        self._filesize_sum += sign * filesize
+        self._downloaded_sum += sign * filesize * percent / 100.0
+
+    def _clear(self, slot):
+        self.percent[slot] = 0.0
+        self.speed[slot] = 0.0
+        self.eta[slot] = -1.0
+        self.filesize[slot] = 0.0
+
+
+def _whole_bytes(value):
+    # The running sums drift by a fraction of a byte when the items
+    # leave them, count anything below one byte as nothing
+    #
+    return value if value >= 1.0 else 0.0
@@ -0,0 +1,203 @@
+# This Python file uses the following encoding: utf-8
+""" YoutubeDlg module for reading the pipes of all the youtube-dl processes.
+
+A single PipeReactor thread watches the stdout & stderr pipes of every
+running youtube-dl process with the selectors module and hands every
+complete line to the callback registered for that pipe. The number of
+reader threads stays one whatever the number of workers.
+
+The pipes are read in large raw chunks, split on both '\r' & '\n' and
+the lines stay bytes, so the callbacks (or a per-pipe filter) can drop
+lines before paying for their decoding.
+
+Notes:
+    select() works only on sockets on Windows, get_reactor() returns None
+    there and the downloaders keep reading their pipes themselves.
+
+"""
+
+import os
+import queue
+import logging
+import selectors
+
+from threading import (
+    Thread,
+    Lock,
+)
+
+_reactor = None
+_reactor_lock = Lock()
+
+
+def get_reactor():
+    """Return the shared PipeReactor, started on the first call.
+
+    Ret:
+        PipeReactor or None if pipes can not be multiplexed on this platform.
+    """
+    global _reactor
+
+    if os.name == 'nt':
+        return None
+
+    with _reactor_lock:
+        if _reactor is None:
+            _reactor = PipeReactor()
+
+    return _reactor
+
+
+class _LineBuffer(object):
+    # Splits the chunks read from one pipe into non empty lines
+
+    def __init__(self, on_line, on_close, filter_lines=None):
+        self.on_line = on_line
+        self.on_close = on_close
+        self.filter_lines = filter_lines
+        self._partial = b''
+
+    def feed(self, chunk):
+        # youtube-dl ends the progress lines with '\r' without --newline
+        lines = (self._partial + chunk).replace(b'\r', b'\n').split(b'\n')
+        self._partial = lines.pop()
+
+        self._dispatch(lines)
+
+    def close(self):
+        # on_close() always runs, the downloader waits for it
+        try:
+            if self._partial:
+                self._dispatch([self._partial])
+                self._partial = b''
+        finally:
+            self.on_close()
+
+    def fail(self, error):
+        # The pipe could not be watched, nothing will be read from it
+        self.on_close(error)
+
+    def _dispatch(self, lines):
+        if self.filter_lines is not None:
+            try:
+                lines = self.filter_lines(lines)
+            except Exception:
+                logging.exception("PipeReactor line filter failed")
+
+        for line in lines:
+            if not line:
+                continue
+
+            # A bad line must not drop the other lines of the chunk
+            try:
+                self.on_line(line)
+            except Exception:
+                logging.exception("PipeReactor line callback failed")
+
+
+class PipeReactor(Thread):
+    """
+    Thread that reads the registered pipes as soon as they have data.
+
+    Attributes:
+        READ_SIZE (int): Max number of bytes read from a pipe at once.
+
+    Notes:
+        The callbacks run on the reactor thread and should return fast,
+        a slow callback delays the lines of all the other processes.
+
+    """
+
+    READ_SIZE = 65536
+
+    def __init__(self):
+        super(PipeReactor, self).__init__(name='PipeReactor', daemon=True)
+        self._selector = selectors.DefaultSelector()
+
+        # Pipes waiting to be added to the selector by the reactor thread
+        self._pending = queue.Queue()
+
+        # Self-pipe that wakes up select() when a pipe is registered
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        os.set_blocking(self._wakeup_write, False)
+        self._selector.register(self._wakeup_read, selectors.EVENT_READ, None)
+
+        self.start()
+
+    def register(self, pipe, on_line, on_close, filter_lines=None):
+        """Watch the given pipe until it is closed by the other side.
+
+        Args:
+            pipe (file object): Readable pipe (binary mode) e.g. Popen.stdout.
+
+            on_line (function): Called with every non empty line (bytes,
+                without the line ending).
+
+            on_close (function): Called without arguments after the last
+                line once the other side closed the pipe, or at once with
+                the exception if the pipe could not be watched.
+
+            filter_lines (function): Optional function that gets the list of
+                lines of every chunk read and returns the lines to pass to
+                on_line.
+
+        """
+        fd = pipe.fileno()
+        os.set_blocking(fd, False)
+
+        self._pending.put((fd, _LineBuffer(on_line, on_close, filter_lines)))
+
+        try:
+            os.write(self._wakeup_write, b'\0')
+        except BlockingIOError:
+            # The reactor already has a wake up waiting
+            pass
+
+    def run(self):
+        while True:
+            for key, _ in self._selector.select():
+                if key.data is None:
+                    self._add_pending()
+                else:
+                    self._read(key.fd, key.data)
+
+    def _add_pending(self):
+        try:
+            while os.read(self._wakeup_read, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        while not self._pending.empty():
+            fd, line_buffer = self._pending.get_nowait()
+
+            try:
+                self._selector.register(fd, selectors.EVENT_READ, line_buffer)
+            except (OSError, ValueError, KeyError) as error:
+                # Closed or already watched fd, end the pipe at once so
+                # its download fails instead of waiting forever
+                logging.exception("PipeReactor could not watch fd %d", fd)
+
+                try:
+                    line_buffer.fail(error)
+                except Exception:
+                    logging.exception("PipeReactor close callback failed")
+
+    def _read(self, fd, line_buffer):
+        try:
+            chunk = os.read(fd, self.READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            chunk = b''
+
+        try:
+            if chunk:
+                line_buffer.feed(chunk)
+            else:
+                self._selector.unregister(fd)
+                line_buffer.close()
+        except Exception:
+            # Never let a callback kill the reader of all the pipes
+            logging.exception("PipeReactor callback failed")
@@ -0,0 +1,151 @@
+# This Python file uses the following encoding: utf-8
+""" YoutubeDlg module for the download scheduling limits.
+
+Two limits are shared by all the downloads of a DownloadManager:
+    - A per-host cap on the number of concurrent downloads, so a queue
+      full of items from the same site does not trigger its per-IP
+      throttling while the items of other hosts wait.
+    - A global bandwidth budget in bytes per second.
+
+Attributes:
+    HOST_ALIASES (dict): Hostnames that are served by the same site.
+
+Notes:
+    The bandwidth budget can not be moved between running youtube-dl
+    processes, so every process gets a fixed share of it with the
+    --limit-rate switch (budget / number of workers). The 'inprocess'
+    engine runs in the youtube-dlg process and uses the shared token
+    bucket instead, so a single download can use the whole budget.
+
+"""
+
+import time
+
+from threading import Lock
+
+from urllib.parse import urlparse
+
+HOST_ALIASES = {
+    'youtu.be': 'youtube.com',
+    'music.youtube.com': 'youtube.com',
+}
+
+_HOST_PREFIXES = ('www.', 'm.')
+
+
+def host_of(url):
+    """Return the host the per-host cap applies to.
+
+    Example:
+        'https://www.youtube.com/watch?v=x' -> 'youtube.com'
+        'https://youtu.be/x' -> 'youtube.com'
+
+    """
+    host = (urlparse(url).hostname or '').lower()
+
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+
+    return HOST_ALIASES.get(host, host)
+
+
+def saturated_hosts(active_hosts, max_per_host):
+    """Return the set of hosts that reached the per-host cap.
+
+    Args:
+        active_hosts (iterable): Host of every running download.
+
+        max_per_host (int): Max concurrent downloads per host, zero means
+            no limit.
+
+    """
+    if not max_per_host:
+        return set()
+
+    counts = {}
+
+    for host in active_hosts:
+        counts[host] = counts.get(host, 0) + 1
+
+    return set(host for host, count in counts.items() if count >= max_per_host)
+
+
+class TokenBucket(object):
+    """
+    Thread safe token bucket, one token per byte.
+
+    consume() lets the caller go into debt and sleeps until the debt is
+    paid back, so the long term rate of all the callers together is the
+    bucket rate whatever the size of the chunks.
+
+    Args:
+        rate (int): Tokens (bytes) added per second.
+
+        capacity (int): Max tokens kept while nobody consumes them.
+            Defaults to one second of rate.
+
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = self.rate if capacity is None else float(capacity)
+
+        self._lock = Lock()
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+
+    def consume(self, amount):
+        # Take amount tokens and sleep if the bucket is in debt
+        #
+        with self._lock:
+            now = time.monotonic()
+
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= amount
+
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+class BandwidthLimiter(object):
+    """
+    Global bandwidth budget of the download processes.
+
+    Args:
+        limit (int): Total bandwidth in bytes per second, zero means
+            no limit.
+
+        processes (int): Max number of concurrent download processes
+            the budget is split across.
+
+    """
+
+    def __init__(self, limit, processes):
+        self.limit = limit
+        self.processes = max(processes, 1)
+
+        self._bucket = TokenBucket(limit) if limit else None
+
+    def process_rate(self):
+        # Return the --limit-rate share (bytes per second) of one process
+        #
+        return max(self.limit // self.processes, 1)
+
+    def rate_options(self):
+        # Return the youtube-dl options that apply the process share
+        #
+        if not self.limit:
+            return ()
+
+        return ('--limit-rate', str(self.process_rate()))
+
+    def consume(self, amount):
+        # Take amount bytes from the shared budget (in-process downloads)
+        #
+        if self._bucket is not None and amount > 0:
+            self._bucket.consume(amount)
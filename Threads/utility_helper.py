@@ -99,6 +99,35 @@ def get_time(seconds):
     
     return dtime
 
+def format_seconds(seconds):
+    """
+    Format seconds to youtube-dl ETA strings (MM:SS or HH:MM:SS).
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    if hours > 99:
+        return '--:--:--'
+    if hours == 0:
+        return '%02d:%02d' % (minutes, seconds)
+
+    return '%02d:%02d:%02d' % (hours, minutes, seconds)
+
+def to_seconds(string):
+    """
+    Convert given youtube-dl ETA string (MM:SS or HH:MM:SS) to seconds.
+    Returns -1 if the ETA is unknown.
+    """
+    seconds = 0
+
+    try:
+        for part in string.split(':'):
+            seconds = seconds * 60 + int(part)
+    except ValueError:
+        return -1
+
+    return seconds
+
 def to_bytes(string):
     """
     Convert given youtube-dl size string to bytes.
@@ -117,10 +146,11 @@ def format_bytes(bytes):
     """
     Format bytes to youtube-dl output strings.
     """
-    if bytes == 0.0:
+    if bytes < 1.0:
+        # log() of a fraction of a byte is negative
         exponent = 0
     else:
-        exponent = int(math.log(bytes, KILO_SIZE))
+        exponent = min(int(math.log(bytes, KILO_SIZE)), len(FILESIZE_METRICS) - 1)
 
     suffix = FILESIZE_METRICS[exponent]
     output_val = bytes / (KILO_SIZE ** exponent)
@@ -0,0 +1,422 @@
+# This Python file uses the following encoding: utf-8
+""" YoutubeDlg module for running youtube-dl inside a long-lived host.
+
+This module drives youtube_dl.YoutubeDL directly from python so the
+interpreter startup, the youtube_dl import and the extractors loading
+are paid once per host process instead of once per URL.
+
+Attributes:
+    VALUED_FLAGS (dict): youtube-dl command line switches that take a value
+        mapped to (YoutubeDL param, converter).
+
+    BOOLEAN_FLAGS (dict): youtube-dl command line switches without a value
+        mapped to (YoutubeDL param, value).
+
+    IGNORED_FLAGS (tuple): Switches that have no meaning in-process.
+
+Notes:
+    youtube_dl is an optional dependency. When it can not be imported, or
+    the options contain a switch that build_params() does not translate,
+    InProcessDownloader falls back to downloader.YoutubeDLDownloader.
+
+"""
+
+import threading
+
+from .utility_helper import (
+    format_bytes,
+    format_seconds,
+)
+
+from .downloader import (
+    BaseDownloader,
+    YoutubeDLDownloader,
+    extract_data,
+)
+
+_youtube_dl = None
+_import_lock = threading.Lock()
+
+
+def load_youtube_dl():
+    """Import youtube_dl once per process.
+
+    Ret:
+        The youtube_dl module or None if it is not installed.
+    """
+    global _youtube_dl
+
+    with _import_lock:
+        if _youtube_dl is None:
+            try:
+                import youtube_dl
+                _youtube_dl = youtube_dl
+            except ImportError:
+                _youtube_dl = False
+
+    return _youtube_dl or None
+
+
+def _parse_filesize(value):
+    # Convert youtube-dl filesize strings ('50k', '44.6m') to bytes
+    #
+    from youtube_dl.downloader.common import FileDownloader
+
+    size = FileDownloader.parse_bytes(value)
+
+    if size is None:
+        raise ValueError(value)
+
+    return size
+
+
+VALUED_FLAGS = {
+    '--playlist-start': ('playliststart', int),
+    '--playlist-end': ('playlistend', int),
+    '--max-downloads': ('max_downloads', int),
+    '-u': ('username', str),
+    '-p': ('password', str),
+    '--video-password': ('videopassword', str),
+    '-R': ('retries', lambda value: float('inf') if value == 'infinite' else int(value)),
+    '--proxy': ('proxy', str),
+    '--min-filesize': ('min_filesize', _parse_filesize),
+    '--max-filesize': ('max_filesize', _parse_filesize),
+    '--limit-rate': ('ratelimit', _parse_filesize),
+    '-o': ('outtmpl', str),
+    '-f': ('format', str),
+    '--sub-lang': ('subtitleslangs', lambda value: value.split(',')),
+    '--audio-format': ('audio_format', str),
+    '--audio-quality': ('audio_quality', str),
+    '--download-archive': ('download_archive', str),
+    '--load-info-json': ('load_info_filename', str),
+}
+
+BOOLEAN_FLAGS = {
+    '-i': ('ignoreerrors', True),
+    '--write-description': ('writedescription', True),
+    '--write-info-json': ('writeinfojson', True),
+    '--write-thumbnail': ('writethumbnail', True),
+    '--all-subs': ('allsubtitles', True),
+    '--write-auto-sub': ('writeautomaticsub', True),
+    '--write-sub': ('writesubtitles', True),
+    '-k': ('keepvideo', True),
+    '--restrict-filenames': ('restrictfilenames', True),
+    '--embed-subs': ('embed_subs', True),
+    '-x': ('extract_audio', True),
+    '-v': ('verbose', True),
+    '--hls-prefer-native': ('hls_prefer_native', True),
+    '--no-mtime': ('updatetime', False),
+    '--embed-thumbnail': ('embed_thumbnail', True),
+    '--add-metadata': ('add_metadata', True),
+}
+
+IGNORED_FLAGS = ('--newline', '--ignore-config')
+
+def build_params(options):
+    """Translate the youtube-dl options list to YoutubeDL params.
+
+    Args:
+        options (list): youtube-dl command line options as returned by
+            parsers.OptionsParser.parse().
+
+    Ret:
+        python dict with the YoutubeDL params or None if the options
+        contain a switch that can not be used in-process.
+
+    """
+    params = {}
+    index = 0
+
+    while index < len(options):
+        flag = options[index]
+
+        if flag in IGNORED_FLAGS:
+            pass
+        elif flag in BOOLEAN_FLAGS:
+            key, value = BOOLEAN_FLAGS[flag]
+            params[key] = value
+        elif flag in VALUED_FLAGS and index + 1 < len(options):
+            key, converter = VALUED_FLAGS[flag]
+            index += 1
+
+            try:
+                params[key] = converter(options[index])
+            except (ValueError, TypeError):
+                return None
+        else:
+            return None
+
+        index += 1
+
+    # Same post processors & order as youtube_dl/__init__.py
+    postprocessors = []
+
+    if params.pop('extract_audio', False) or 'audio_format' in params:
+        postprocessors.append({
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': params.pop('audio_format', 'best'),
+            'preferredquality': params.pop('audio_quality', '5'),
+            'nopostoverwrites': False,
+        })
+
+    params.pop('audio_format', None)
+    params.pop('audio_quality', None)
+
+    if params.pop('add_metadata', False):
+        postprocessors.append({'key': 'FFmpegMetadata'})
+
+    if params.pop('embed_subs', False):
+        postprocessors.append({'key': 'FFmpegEmbedSubtitle'})
+
+    if params.pop('embed_thumbnail', False):
+        postprocessors.append({
+            'key': 'EmbedThumbnail',
+            'already_have_thumbnail': params.get('writethumbnail', False),
+        })
+        params['writethumbnail'] = True
+
+    if params.get('allsubtitles') and not params.get('writeautomaticsub'):
+        params['writesubtitles'] = True
+
+    params['postprocessors'] = postprocessors
+
+    return params
+
+
+def progress_data(status):
+    """Map a YoutubeDL progress hook dict to the extract_data() format.
+
+    Args:
+        status (dict): Dict passed by youtube_dl to the progress_hooks.
+
+    Ret:
+        python dict with the same keys & string values that extract_data()
+        returns for the corresponding '[download]' line. Can be empty.
+
+    """
+    data = {}
+
+    if status['status'] == 'downloading':
+        data['status'] = 'Downloading'
+
+        downloaded = status.get('downloaded_bytes')
+        total = status.get('total_bytes')
+        estimate = status.get('total_bytes_estimate')
+
+        if downloaded is not None and (total or estimate):
+            if total:
+                data['filesize'] = format_bytes(total)
+            else:
+                data['filesize'] = '~' + format_bytes(estimate)
+
+            data['percent'] = '{0:.1f}%'.format(downloaded * 100.0 / (total or estimate))
+
+            speed = status.get('speed')
+            eta = status.get('eta')
+
+            data['speed'] = 'Unknown' if speed is None else format_bytes(speed) + '/s'
+            data['eta'] = 'Unknown' if eta is None else format_seconds(eta)
+
+    elif status['status'] == 'finished' and 'elapsed' in status:
+        # Same as the '[download] 100% of <size> in <time>' line.
+        # Files that were already downloaded have no 'elapsed' key and
+        # are reported by the '... has already been downloaded' line.
+        total = status.get('total_bytes') or status.get('downloaded_bytes') or 0
+
+        data['status'] = 'Already Downloaded'
+        data['filesize'] = format_bytes(total)
+        data['percent'] = '100%'
+        data['eta'] = ''
+        data['speed'] = ''
+
+    return data
+
+
+class DownloadCancelled(Exception):
+    """Raised from the youtube_dl callbacks to abort the running download."""
+
+
+class _HostLogger(object):
+    # youtube_dl logger that routes the messages back to the downloader.
+    # Screen messages ('[download] Destination: ...', '[ffmpeg] ...') come
+    # in through debug() and still go through extract_data().
+
+    def __init__(self, downloader):
+        self._downloader = downloader
+
+    def debug(self, msg):
+        self._downloader._on_screen(msg)
+
+    def warning(self, msg):
+        self._downloader._on_stderr('WARNING: ' + msg)
+
+    def error(self, msg):
+        self._downloader._on_stderr(msg)
+
+
+class InProcessDownloader(BaseDownloader):
+    """
+    Download engine that runs youtube_dl.YoutubeDL in the current process.
+
+    Same contract as downloader.YoutubeDLDownloader: download(url, options)
+    blocks until the download completes and returns one of the
+    BaseDownloader return codes, data_hook receives extract_data() dicts
+    and log_data receives the warning & error lines.
+
+    Args:
+        youtubedl_path (string): Absolute path to youtube-dl binary. Used only
+            when falling back to the subprocess engine.
+
+        data_hook (function): Optional callback function to retrieve download
+            process data.
+
+        log_data (function): Optional callback function to write data to
+            the log file.
+
+        bandwidth (scheduler.BandwidthLimiter): Optional bandwidth budget
+            shared with the other downloads of the process.
+
+    Notes:
+        stop() cancels the download on the next youtube_dl callback. A
+        running ffmpeg post processor is not interrupted.
+
+    """
+
+    def __init__(self, youtubedl_path, data_hook=None, log_data=None, bandwidth=None):
+        super(InProcessDownloader, self).__init__(data_hook, log_data)
+        self.youtubedl_path = youtubedl_path
+        self.bandwidth = bandwidth
+
+        self._stopped = False
+        self._fallback = None
+
+        # Bytes of the current file already taken from the bandwidth budget
+        self._consumed = 0
+
+    def download(self, url, options):
+        """Download url using given options.
+
+        See downloader.YoutubeDLDownloader.download() for the return codes.
+        """
+        self._ret_code = self.OK
+        self._stopped = False
+        self._consumed = 0
+        self._reset_stderr()
+
+        youtube_dl = load_youtube_dl()
+        params = None if youtube_dl is None else build_params(options)
+
+        if params is None:
+            return self._fallback_download(url, options)
+
+        params['logger'] = _HostLogger(self)
+        params['progress_hooks'] = [self._progress_hook]
+        params['noprogress'] = True
+
+        # Skip the playlist entries that come after a stop()
+        user_filter = params.get('match_filter')
+        params['match_filter'] = lambda info, *args: self._match_filter(user_filter, info, *args)
+
+        # Not a YoutubeDL param, see infocache.InfoCache
+        info_file = params.pop('load_info_filename', None)
+
+        try:
+            with youtube_dl.YoutubeDL(params) as ydl:
+                if info_file is None:
+                    ydl.download([url])
+                else:
+                    ydl.download_with_info_file(info_file)
+        except DownloadCancelled:
+            self._set_retcode(self.STOPPED)
+        except youtube_dl.utils.DownloadError:
+            # Already reported through the logger
+            self._set_retcode(self.ERROR)
+        except Exception as error:
+            self._on_stderr('ERROR: {0}'.format(error))
+
+        # With ignoreerrors (-i) youtube_dl reports the DownloadCancelled
+        # of the hooks as an error and returns normally
+        if self._stopped:
+            self._set_retcode(self.STOPPED)
+
+        self._last_data_hook()
+
+        return self._ret_code
+
+    def stop(self):
+        # Stop the download process and set return code to stopped
+        #
+        self._stopped = True
+
+        if self._fallback is not None:
+            self._fallback.stop()
+
+    def close(self):
+        if self._fallback is not None:
+            self._fallback.close()
+
+    def _fallback_download(self, url, options):
+        # Download with a youtube-dl subprocess
+        #
+        if self._fallback is None:
+            self._fallback = YoutubeDLDownloader(self.youtubedl_path,
+                                                 self.data_hook,
+                                                 self.log_data)
+
+        if self.bandwidth is not None:
+            # A separate process can only get a fixed share of the budget
+            options = options + self.bandwidth.rate_options()
+
+        return self._fallback.download(url, options)
+
+    def _check_stopped(self):
+        if self._stopped:
+            raise DownloadCancelled()
+
+    def _match_filter(self, user_filter, info, *args):
+        # YoutubeDL match_filter, returns the reason to skip the entry or None
+        #
+        if self._stopped:
+            return 'Download stopped'
+
+        if user_filter is not None:
+            return user_filter(info, *args)
+
+        return None
+
+    def _progress_hook(self, status):
+        self._check_stopped()
+
+        if self.bandwidth is not None:
+            self._throttle(status)
+
+        data = progress_data(status)
+
+        if data:
+            self._hook_data(data)
+
+    def _throttle(self, status):
+        # Take the bytes downloaded since the last hook from the shared
+        # budget, sleeps (inside the youtube_dl download loop) when in debt
+        #
+        if status['status'] != 'downloading':
+            return
+
+        downloaded = status.get('downloaded_bytes') or 0
+
+        if downloaded < self._consumed:
+            # Next file (video, audio, playlist entry)
+            self._consumed = 0
+
+        self.bandwidth.consume(downloaded - self._consumed)
+        self._consumed = downloaded
+
+    def _on_screen(self, msg):
+        # With 'noprogress' set the '[download]  x%' lines are not printed,
+        # the progress comes from the hooks
+        self._check_stopped()
+
+        data = extract_data(msg)
+
+        if data:
+            self._hook_data(data)
@@ -214,83 +214,39 @@ class Ui_MainFrameWnd(object):
         spacerItem3 = QtWidgets.QSpacerItem(800, 17, QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Minimum)
         self.horizontalLayout_4.addItem(spacerItem3)
         self.verticalLayout_2.addLayout(self.horizontalLayout_4)
-        self._dl_tablewidget = QtWidgets.QTableWidget(self.DownloadTab)
-        self._dl_tablewidget.setEnabled(True)
+        self._dl_tableview = QtWidgets.QTableView(self.DownloadTab)
+        self._dl_tableview.setEnabled(True)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.MinimumExpanding)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
-        sizePolicy.setHeightForWidth(self._dl_tablewidget.sizePolicy().hasHeightForWidth())
-        self._dl_tablewidget.setSizePolicy(sizePolicy)
-        self._dl_tablewidget.setMinimumSize(QtCore.QSize(895, 192))
+        sizePolicy.setHeightForWidth(self._dl_tableview.sizePolicy().hasHeightForWidth())
+        self._dl_tableview.setSizePolicy(sizePolicy)
+        self._dl_tableview.setMinimumSize(QtCore.QSize(895, 192))
         font = QtGui.QFont()
         font.setFamily("MS Sans Serif")
         font.setPointSize(10)
-        self._dl_tablewidget.setFont(font)
-        self._dl_tablewidget.setAutoFillBackground(False)
-        self._dl_tablewidget.setFrameShape(QtWidgets.QFrame.Panel)
-        self._dl_tablewidget.setFrameShadow(QtWidgets.QFrame.Sunken)
-        self._dl_tablewidget.setSizeAdjustPolicy(QtWidgets.QAbstractScrollArea.AdjustIgnored)
-        self._dl_tablewidget.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
-        self._dl_tablewidget.setGridStyle(QtCore.Qt.SolidLine)
-        self._dl_tablewidget.setWordWrap(True)
-        self._dl_tablewidget.setObjectName("_dl_tablewidget")
-        self._dl_tablewidget.setColumnCount(7)
-        self._dl_tablewidget.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        font = QtGui.QFont()
-        font.setFamily("MS Sans Serif")
-        font.setPointSize(10)
-        item.setFont(font)
-        self._dl_tablewidget.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        font = QtGui.QFont()
-        font.setFamily("MS Sans Serif")
-        font.setPointSize(10)
-        item.setFont(font)
-        self._dl_tablewidget.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        font = QtGui.QFont()
-        font.setFamily("MS Sans Serif")
-        font.setPointSize(10)
-        item.setFont(font)
-        self._dl_tablewidget.setHorizontalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        font = QtGui.QFont()
-        font.setFamily("MS Sans Serif")
-        font.setPointSize(10)
-        item.setFont(font)
-        self._dl_tablewidget.setHorizontalHeaderItem(3, item)
-        item = QtWidgets.QTableWidgetItem()
-        font = QtGui.QFont()
-        font.setFamily("MS Sans Serif")
-        font.setPointSize(10)
-        item.setFont(font)
-        self._dl_tablewidget.setHorizontalHeaderItem(4, item)
-        item = QtWidgets.QTableWidgetItem()
-        font = QtGui.QFont()
-        font.setFamily("MS Sans Serif")
-        font.setPointSize(10)
-        item.setFont(font)
-        self._dl_tablewidget.setHorizontalHeaderItem(5, item)
-        item = QtWidgets.QTableWidgetItem()
-        font = QtGui.QFont()
-        font.setFamily("MS Sans Serif")
-        font.setPointSize(10)
-        item.setFont(font)
-        self._dl_tablewidget.setHorizontalHeaderItem(6, item)
-        self._dl_tablewidget.horizontalHeader().setVisible(True)
-        self._dl_tablewidget.horizontalHeader().setCascadingSectionResizes(True)
-        self._dl_tablewidget.horizontalHeader().setDefaultSectionSize(69)
-        self._dl_tablewidget.horizontalHeader().setHighlightSections(False)
-        self._dl_tablewidget.horizontalHeader().setMinimumSectionSize(40)
-        self._dl_tablewidget.horizontalHeader().setSortIndicatorShown(True)
-        self._dl_tablewidget.horizontalHeader().setStretchLastSection(False)
-        self._dl_tablewidget.verticalHeader().setVisible(True)
-        self._dl_tablewidget.verticalHeader().setCascadingSectionResizes(False)
-        self._dl_tablewidget.verticalHeader().setDefaultSectionSize(30)
-        self._dl_tablewidget.verticalHeader().setSortIndicatorShown(False)
-        self._dl_tablewidget.verticalHeader().setStretchLastSection(False)
-        self.verticalLayout_2.addWidget(self._dl_tablewidget)
+        self._dl_tableview.setFont(font)
+        self._dl_tableview.setAutoFillBackground(False)
+        self._dl_tableview.setFrameShape(QtWidgets.QFrame.Panel)
+        self._dl_tableview.setFrameShadow(QtWidgets.QFrame.Sunken)
+        self._dl_tableview.setSizeAdjustPolicy(QtWidgets.QAbstractScrollArea.AdjustIgnored)
+        self._dl_tableview.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self._dl_tableview.setGridStyle(QtCore.Qt.SolidLine)
+        self._dl_tableview.setWordWrap(True)
+        self._dl_tableview.setObjectName("_dl_tableview")
+        self._dl_tableview.horizontalHeader().setVisible(True)
+        self._dl_tableview.horizontalHeader().setCascadingSectionResizes(True)
+        self._dl_tableview.horizontalHeader().setDefaultSectionSize(69)
+        self._dl_tableview.horizontalHeader().setHighlightSections(False)
+        self._dl_tableview.horizontalHeader().setMinimumSectionSize(40)
+        self._dl_tableview.horizontalHeader().setSortIndicatorShown(False)
+        self._dl_tableview.horizontalHeader().setStretchLastSection(False)
+        self._dl_tableview.verticalHeader().setVisible(True)
+        self._dl_tableview.verticalHeader().setCascadingSectionResizes(False)
+        self._dl_tableview.verticalHeader().setDefaultSectionSize(30)
+        self._dl_tableview.verticalHeader().setSortIndicatorShown(False)
+        self._dl_tableview.verticalHeader().setStretchLastSection(False)
+        self.verticalLayout_2.addWidget(self._dl_tableview)
         self.verticalLayout_4.addLayout(self.verticalLayout_2)
         self.horizontalLayout_6 = QtWidgets.QHBoxLayout()
         self.horizontalLayout_6.setObjectName("horizontalLayout_6")
@@ -583,21 +539,6 @@ class Ui_MainFrameWnd(object):
         self._browser_btn.setText(_translate("MainFrameWnd", "..."))
         self._add_btn.setText(_translate("MainFrameWnd", "Add"))
         self._dl_list_label.setText(_translate("MainFrameWnd", "Download list"))
-        self._dl_tablewidget.setSortingEnabled(True)
-        item = self._dl_tablewidget.horizontalHeaderItem(0)
-        item.setText(_translate("MainFrameWnd", "Title"))
-        item = self._dl_tablewidget.horizontalHeaderItem(1)
-        item.setText(_translate("MainFrameWnd", "Extension"))
-        item = self._dl_tablewidget.horizontalHeaderItem(2)
-        item.setText(_translate("MainFrameWnd", "Size"))
-        item = self._dl_tablewidget.horizontalHeaderItem(3)
-        item.setText(_translate("MainFrameWnd", "Percent"))
-        item = self._dl_tablewidget.horizontalHeaderItem(4)
-        item.setText(_translate("MainFrameWnd", "ETA"))
-        item = self._dl_tablewidget.horizontalHeaderItem(5)
-        item.setText(_translate("MainFrameWnd", "Speed"))
-        item = self._dl_tablewidget.horizontalHeaderItem(6)
-        item.setText(_translate("MainFrameWnd", "Status"))
         self._downloadBtn.setToolTip(_translate("MainFrameWnd", "Start"))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.DownloadTab), _translate("MainFrameWnd", "Download"))
         self.ConvertMultipleDestinationLabel.setText(_translate("MainFrameWnd", "Save to"))
@@ -17,6 +17,10 @@ class Ui_Dialog(object):
         Dialog.resize(945, 400)
         self.verticalLayout = QtWidgets.QVBoxLayout(Dialog)
         self.verticalLayout.setObjectName("verticalLayout")
+        self.SearchEdit = QtWidgets.QLineEdit(Dialog)
+        self.SearchEdit.setClearButtonEnabled(True)
+        self.SearchEdit.setObjectName("SearchEdit")
+        self.verticalLayout.addWidget(self.SearchEdit)
         self.UrlsList = QtWidgets.QTextEdit(Dialog)
         font = QtGui.QFont()
         font.setPointSize(9)
@@ -26,6 +30,14 @@ class Ui_Dialog(object):
         self.UrlsList.setTextInteractionFlags(QtCore.Qt.TextSelectableByKeyboard|QtCore.Qt.TextSelectableByMouse)
         self.UrlsList.setObjectName("UrlsList")
         self.verticalLayout.addWidget(self.UrlsList)
+        self.LogView = QtWidgets.QListView(Dialog)
+        font = QtGui.QFont()
+        font.setPointSize(9)
+        self.LogView.setFont(font)
+        self.LogView.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.LogView.setUniformItemSizes(True)
+        self.LogView.setObjectName("LogView")
+        self.verticalLayout.addWidget(self.LogView)
         self.horizontalLayout = QtWidgets.QHBoxLayout()
         self.horizontalLayout.setObjectName("horizontalLayout")
         self.BrowserBtn = QtWidgets.QPushButton(Dialog)
@@ -47,6 +59,7 @@ class Ui_Dialog(object):
     def retranslateUi(self, Dialog):
         _translate = QtCore.QCoreApplication.translate
         Dialog.setWindowTitle(_translate("Dialog", "Dialog"))
+        self.SearchEdit.setPlaceholderText(_translate("Dialog", "Search"))
         self.UrlsList.setHtml(_translate("Dialog", "<!DOCTYPE HTML PUBLIC \"-//W3C//DTD HTML 4.0//EN\" \"http://www.w3.org/TR/REC-html40/strict.dtd\">\n"
 "<html><head><meta name=\"qrichtext\" content=\"1\" /><style type=\"text/css\">\n"
 "p, li { white-space: pre-wrap; }\n"
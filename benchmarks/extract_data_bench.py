@@ -0,0 +1,257 @@
+# This Python file uses the following encoding: utf-8
+""" Benchmark & equivalence check of downloader.extract_data().
+
+Runs the current parser and legacy_extract_data(), a copy of the parser
+it replaced, over the youtube-dl output lines of extract_data_corpus.txt.
+
+Usage:
+    python benchmarks/extract_data_bench.py [REPEAT]
+
+The script exits with status 1 if the two parsers return different data
+for any line of the corpus. Lines on which the legacy parser raised are
+reported but not compared, neither are the ADDED_KEYS of the current
+parser.
+
+"""
+
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Threads.downloader import extract_data
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'extract_data_corpus.txt')
+
+REPEAT = 2000
+
+# Keys the current parser returns on top of the legacy ones
+ADDED_KEYS = ('info_json',)
+
+
+def legacy_extract_data(stdout):
+    """Extract data from youtube-dl stdout.
+
+    Args:
+        stdout (string): Contains the youtube-dl stdout.
+
+    Ret:
+        python dict: The returned dict can be empty if there are
+        no data to extract eslt it may contrain one of more of the
+        following keys:
+
+        status: contains the status of the process download.
+        path: destination path
+        extension: the file extension
+        filenme: the file name with out ext
+        percent: the percentage of the video being downloaded.
+        eta: estimate time for the completion of the download process.
+        speed: download speed
+        filesize: the size of the video file being downloaded
+        playlist_index: the playlist index of the current video file being downloaded
+        playlist_size: the number of vides in the playlist
+
+
+    """ 
+    # REFACTOR
+    def extract_filename(input_data):
+        path, fullname = os.path.split(input_data.strip("\""))
+        filename, extension = os.path.splitext(fullname)
+
+        return path, filename, extension
+
+    data_dictionary = {}
+
+    if not stdout:
+        return data_dictionary
+
+
+    # We want to keep the spaces in order to extract filenames with
+    # multiple whitespaces correctly. We also keep a copy of the old 
+    # 'std' for backward compatibility with the old code
+    # Output template example
+    # stdout = "[download]   1.9% of 4.30GiB at  1.01MiB/s ETA 01:11:25"
+
+    stdout_with_spaces = stdout.split(' ')
+    stdout = stdout.split()
+
+    #+++++<DEBUG_LOG>
+    logging.debug("%s", stdout)
+    #-----<DEBUG_LOG>
+
+    stdout[0] = stdout[0].lstrip('\r')
+
+    if stdout[0] == '[download]':
+        data_dictionary['status'] = 'Downloading'
+
+        # Get path, filename & ext
+        if stdout[1] == 'Destination:':
+            path, filename, extension = extract_filename(' '.join(stdout_with_spaces[2:]))
+
+            data_dictionary['path'] = path
+            data_dictionary['filename'] = filename
+            data_dictionary['extension'] = extension
+
+        # Get progress info
+        if '%' in  stdout[1]:
+            if stdout[1] == '100%':
+                data_dictionary['status'] = 'Already Downloaded'
+                data_dictionary['filesize'] = stdout[3]
+                data_dictionary['percent'] = '100%'
+                data_dictionary['eta'] = ''
+                data_dictionary['speed'] = ''
+            else:
+                data_dictionary['percent'] = stdout[1]
+                data_dictionary['filesize'] = stdout[3]
+                data_dictionary['speed'] = stdout[5]
+                data_dictionary['eta'] = stdout[7]
+
+        # Get playlist info (if exist)
+        if stdout[1] == 'Downloading' and stdout[2] == 'video':
+            data_dictionary['playlist_index'] = stdout[3]
+            data_dictionary['playlist_size'] = stdout[5]
+
+        # Remove the 'and merged' part from stdout when using ffmpeg to merge the formats
+        if stdout[-3] == 'downloaded' and stdout [-1] == 'merged':
+            stdout = stdout[:-2]
+            stdout_with_spaces = stdout_with_spaces[:-2]
+
+            data_dictionary['percent'] = '100%'
+
+        # Get file already downloaded status
+        if stdout[-1] == 'downloaded':
+            data_dictionary['status'] = 'Already Downloaded'
+            path, filename, extension = extract_filename(' '.join(stdout_with_spaces[1:-4]))
+
+            data_dictionary['path'] = path
+            data_dictionary['filename'] = filename
+            data_dictionary['extension'] = extension
+
+        # Get filesize abort status
+        if stdout[-1] == 'Aborting.':
+            data_dictionary['status'] = 'Filesize Abort'
+
+    elif stdout[0] == '[hlsnative]':
+        # native hls extractor
+        # see: https://github.com/rg3/youtube-dl/blob/master/youtube_dl/downloader/hls.py#L54
+        data_dictionary['status'] = 'Downloading'
+
+        if len(stdout) == 7:
+            segment_no = float(stdout[6])
+            current_segment = float(stdout[4])
+
+            # Get the percentage
+            percent = '{0:.1f}%'.format(current_segment / segment_no * 100)
+            data_dictionary['percent'] = percent
+
+    elif stdout[0] == '[ffmpeg]':
+        data_dictionary['status'] = 'Post Processing'
+
+        # Get final extension after merging process
+        if stdout[1] == 'Merging':
+            path, filename, extension = extract_filename(' '.join(stdout_with_spaces[4:]))
+
+            data_dictionary['path'] = path
+            data_dictionary['filename'] = filename
+            data_dictionary['extension'] = extension
+
+        # Get final extension ffmpeg post process simple (not file merge)
+        if stdout[1] == 'Destination:':
+            path, filename, extension = extract_filename(' '.join(stdout_with_spaces[2:]))
+
+            data_dictionary['path'] = path
+            data_dictionary['filename'] = filename
+            data_dictionary['extension'] = extension    
+
+        # Get final extension after recoding process
+        if stdout[1] == 'Converting':
+            path, filename, extension = extract_filename(' '.join(stdout_with_spaces[8:]))
+
+            data_dictionary['path'] = path
+            data_dictionary['filename'] = filename
+            data_dictionary['extension'] = extension
+
+    elif stdout[0][0] != '[' or stdout[0] == '[debug]':
+        pass  # Just ignore this output
+
+    else:
+        data_dictionary['status'] = 'Pre Processing'
+
+    return data_dictionary
+
+
+def load_corpus():
+    with open(CORPUS, encoding='utf-8') as corpus:
+        return [line.rstrip('\n') for line in corpus]
+
+
+def check(lines):
+    # Return the number of lines the parsers disagree on
+    #
+    mismatches = 0
+
+    for line in lines:
+        try:
+            expected = legacy_extract_data(line)
+        except (IndexError, ValueError) as error:
+            print('legacy raised {0!r} on: {1}'.format(error, line))
+            continue
+
+        result = extract_data(line)
+
+        for key in ADDED_KEYS:
+            result.pop(key, None)
+
+        if result != expected:
+            mismatches += 1
+            print('MISMATCH: {0}\n  legacy:  {1}\n  current: {2}'.format(line, expected, result))
+
+    return mismatches
+
+
+def bench(parser, lines, repeat):
+    # Return the time in microseconds per parsed line
+    #
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        for line in lines:
+            parser(line)
+
+    return (time.perf_counter() - start) * 1e6 / (repeat * len(lines))
+
+
+def main(repeat=REPEAT):
+    # The legacy parser logged every line at DEBUG level,
+    # measure both without any logging output
+    logging.disable(logging.CRITICAL)
+
+    lines = load_corpus()
+    mismatches = check(lines)
+
+    safe_lines = []
+    for line in lines:
+        try:
+            legacy_extract_data(line)
+            safe_lines.append(line)
+        except (IndexError, ValueError):
+            pass
+
+    progress_lines = [line for line in safe_lines if '%' in line]
+
+    for name, workload in (('corpus', safe_lines), ('progress', progress_lines)):
+        legacy = bench(legacy_extract_data, workload, repeat)
+        current = bench(extract_data, workload, repeat)
+
+        print('{0:<10} legacy {1:6.2f} us/line  current {2:6.2f} us/line  x{3:.2f}'.format(
+            name, legacy, current, legacy / current))
+
+    print('{0} lines, {1} mismatches'.format(len(lines), mismatches))
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else REPEAT))
@@ -1,4 +1,7 @@
 # This Python file uses the following encoding: utf-8
+# Imported first so the start up timing includes the other imports
+from Threads.startup import startup_timer
+
 from math import log
 import os
 import sys
@@ -9,15 +12,14 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 
 import time
+import multiprocessing
 import concurrent.futures
 
 from GUI import *
-from GUI.AboutDlg import AboutDialog
-from GUI.logViewerDlg import logViewerDlg
-from GUI.SettingDlg import SettingDlg
+from GUI.DownloadTableModel import DownloadTableModel
+# Imports resource_rc, the icons of the main window
 from UI.gui_qtdesigner import Ui_MainFrameWnd
 
-import UI.resource_rc
 import logging
 import clipboard
 
@@ -41,6 +43,14 @@ from Threads.logmanager import (
     LogManager
 )
 
+from Threads.progressbus import (
+    ProgressBus
+)
+
+from Threads.canonical import (
+    canonical_url
+)
+
 __PACKAGENAME__ = 'youtube_dl_gui'
 WAIT_TIME = 0.1
 
@@ -48,6 +58,7 @@ from Threads.optionsmanager import OptionsManager
 
 from Threads.utility_helper import (
     open_file,
+    format_bytes,
     get_config_path,
     #get_locale_file,
     __appname__
@@ -55,16 +66,6 @@ from Threads.utility_helper import (
 
 WAIT_TIME = 0.1
 
-# Set config path and create options and log managers
-config_path = get_config_path()
-opt_manager = OptionsManager(config_path)
-log_manager = LogManager(config_path, True)
-
-'''
-if opt_manager.options['enable_log']:
-    log_manager = LogManager(config_path, opt_manager.options['log_time'])
-'''
-
 
 # Setting custom variables
 downloads_dir = str(Path.home() / "Downloads")
@@ -104,7 +105,7 @@ class MainFrameWnd(QMainWindow):
     RUNNING = 1
     ERROR = 2
 
-    URL_REPORT_MSG = "Total progress: {0:.1f}% | Queue({1} | Paused ({2}) | Active ({3}) | Completed ({4}) | Error ({5})"
+    URL_REPORT_MSG = "Total progress: {0:.1f}% | Queue({1} | Paused ({2}) | Active ({3}) | Completed ({4}) | Error ({5}) | Speed {6}/s | Remaining {7}"
 
     LIST_COLUMNS = {
         'filename' : (0, VIDEO_LABEL, 400, True),
@@ -116,12 +117,8 @@ class MainFrameWnd(QMainWindow):
         'status':    (6, STATUS_LABEL, 108, True),
     }
 
-    format = "%(asctime)s: %(message)s"
-    logging.basicConfig(format=format, level=logging.INFO, datefmt='%H:%M:%S')
-    logging.getLogger().setLevel(logging.DEBUG)
-
-    # Update download list result
-    update_date = pyqtSignal(int, object)
+    # Rows (first_row, count) added to the download list by a playlist expansion
+    rows_inserted = pyqtSignal(int, int)
 
     def __init__(self, opt_manager, log_manager, parent=None):
         super(MainFrameWnd, self).__init__(parent)
@@ -146,46 +143,57 @@ class MainFrameWnd(QMainWindow):
         # MAIN STATE
         self.state = self.IDLE
 
-        # Status list sheet table
+        # Set the app icon
+        #
+        path = os.path.join(app_root, 'UI', 'images', 'icon.png')
+        self.setWindowIcon(QtGui.QIcon(path))
+
+        # Download list
+        #
+        self._download_list = DownloadList()
+
+        # Status list sheet table, a view over the download list
+        #
+        columns = sorted(self.LIST_COLUMNS.items(), key=lambda column: column[1][0])
+        self._table_model = DownloadTableModel(self._download_list,
+                                               [(key, value[1]) for key, value in columns],
+                                               self)
+        self.ui._dl_tableview.setModel(self._table_model)
+
         for column_item in self.LIST_COLUMNS.values():
             column = column_item[0]
-            header = QTableWidgetItem( column_item[1] )
-            self.ui._dl_tablewidget.setHorizontalHeaderItem(column, header)
-
             column_width = column_item[2]
-            self.ui._dl_tablewidget.setColumnWidth(column, column_width)
+            self.ui._dl_tableview.setColumnWidth(column, column_width)
 
             #column_resize = column_item[3]
             #if column_resize is True:
-                #self.ui._dl_tablewidget.resizeColumnToContents(0)
-                #self.ui._dl_tablewidget.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+                #self.ui._dl_tableview.resizeColumnToContents(0)
+                #self.ui._dl_tableview.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
 
         # Hook various event to their respective callbacks.
         #
-        self.ui._dl_tablewidget.cellClicked.connect(self._oncellClicked)
-        self.ui._dl_tablewidget.cellChanged.connect(self._oncellChanged)
-        self.ui._dl_tablewidget.cellEntered.connect(self._oncellEntered)
-        self.ui._dl_tablewidget.cellPressed.connect(self._oncellPressed)
-        self.ui._dl_tablewidget.cellActivated.connect(self._cellActivated)
+        self.ui._dl_tableview.clicked.connect(self._oncellClicked)
+        self.ui._dl_tableview.entered.connect(self._oncellEntered)
+        self.ui._dl_tableview.pressed.connect(self._oncellPressed)
+        self.ui._dl_tableview.activated.connect(self._cellActivated)
 
-        self.update_date.connect(self._update_from_item)
-
-        # Set the app icon
-        #
-        path = os.path.join(app_root, 'UI', 'images', 'icon.png')
-        self.setWindowIcon(QtGui.QIcon(path))
+        self.rows_inserted.connect(self._on_rows_inserted)
 
-        # Download list
+        # Items updated by the workers, redrawn by _onTimer()
         #
-        self._download_list = DownloadList()
+        self._progress_bus = ProgressBus()
 
         # Set up youtube-dl option manager
         #
         self._options_parser = OptionsParser()
 
-        # Edit - Running condition
+        # Edit - Running condition, created on first use by _on_settingDlg()
         #
-        self._setting_dlg = SettingDlg(self)
+        self._setting_dlg = None
+
+        # True until the first paintEvent(), see main()
+        #
+        self._first_paint = True
 
         # Set the Timer
         self._app_timer = QTimer(self)
@@ -241,34 +249,21 @@ class MainFrameWnd(QMainWindow):
         path = os.path.join(app_root, 'UI', 'resources', 'start_32px.png')
         self.ui._downloadBtn.setIcon(QtGui.QIcon(path))
 
-    def _oncellClicked(self):
+    def _current_row(self):
+        # Return the selected row of the download table or -1
+        #
+        return self.ui._dl_tableview.currentIndex().row()
+
+    def _oncellClicked(self, index):
         pass
-        #for curItem in self.ui._dl_tablewidget.selectedItems():
         #+++++<DEBUG_LOG>
-        # curItem = self.ui._dl_tablewidget.currentItem()
-        # print('Clicked:', curItem.row(),
-        #                   curItem.column(),
-        #                   curItem.text(), 
-        #                   curItem.data(curItem.row()))
-                
-        #curItem = self.ui._dl_tablewidget.currentItem()
-        #self.ui._dl_tablewidget.removeRow(curItem.row())
-
-        #self.ui._dl_tablewidget.setItem()
-        #self._update_table_by_item(item.row(), item)
+        # print('Clicked:', index.row(),
+        #                   index.column(),
+        #                   index.data())
         #-----<DEBUG_LOG>
 
-    def _oncellChanged(self):
-        for curItem in self.ui._dl_tablewidget.selectedItems():
-            pass
-            #+++++<DEBUG_LOG>
-            #print('Changed:', curItem.row(),
-            #curItem.column(),
-            #curItem.text())
-            #-----<DEBUG_LOG>
-
-    def _oncellEntered(self):
-        for curItem in self.ui._dl_tablewidget.selectedItems():
+    def _oncellEntered(self, index):
+        for curItem in self.ui._dl_tableview.selectedIndexes():
             pass
             #+++++<DEBUG_LOG>
             #print('Entered:', curItem.row(),
@@ -276,8 +271,8 @@ class MainFrameWnd(QMainWindow):
             #curItem.text())
             #-----<DEBUG_LOG>
 
-    def _oncellPressed(self):
-        for curItem in self.ui._dl_tablewidget.selectedItems():
+    def _oncellPressed(self, index):
+        for curItem in self.ui._dl_tableview.selectedIndexes():
             pass
             #+++++<DEBUG_LOG>
             #print('Pressed:', curItem.row(),
@@ -285,13 +280,11 @@ class MainFrameWnd(QMainWindow):
             #curItem.text())
             #-----<DEBUG_LOG>
     
-    def _cellActivated(self):
-        curItem = self.ui._dl_tablewidget.currentItem()
-        print('Clicked:', curItem.row(),
-                          curItem.column(),
-                          curItem.text(), 
-                          curItem.data(curItem.row())) 
-        #for curItem in self.ui._dl_tablewidget.selectedItems():
+    def _cellActivated(self, index):
+        print('Clicked:', index.row(),
+                          index.column(),
+                          index.data())
+        #for curItem in self.ui._dl_tableview.selectedIndexes():
         #    pass
             #+++++<DEBUG_LOG>
             #print('Activated:', curItem.row(),
@@ -327,71 +320,29 @@ class MainFrameWnd(QMainWindow):
 
     def _on_arrow_up(self, event):
 
-        # If table is none
-        row_cnt = self.ui._dl_tablewidget.rowCount()
-        if row_cnt < 1:
-            return
-
         # Selected item
-        index = self.ui._dl_tablewidget.currentRow()
+        index = self._current_row()
         if index <= 0:
             return
 
-        # Selected download item
-        object_id = self._download_list.get_objectid_by_index(index)
-        download_item = self._download_list.get_item_by_objectid(object_id)
-
-        # Swap data in download_list
-        self._download_list.move_up(object_id)
-
-        # Selected item up to 1 step (you'll see they down 1 step in real QWidgettable)
-        new_index = index - 1
-
-        self.ui._dl_tablewidget.removeRow(new_index)
-        self.ui._dl_tablewidget.insertRow(new_index)
-        self.ui._dl_tablewidget.selectRow(new_index)
+        # Swap data in download_list, the model moves the row
+        new_index = self._table_model.move_row(index, True)
 
-        self._update_from_item(new_index, download_item)
-
-        object_id = self._download_list.get_objectid_by_index(index)
-        download_item = self._download_list.get_item_by_objectid(object_id)
-        self.ui._dl_tablewidget.removeRow(index)
-        self.ui._dl_tablewidget.insertRow(index)
-        self._update_from_item(index, download_item)      
+        if new_index != -1:
+            self.ui._dl_tableview.selectRow(new_index)
 
     def _on_arrow_down(self, event):
 
-        # If table is none
-        row_cnt = self.ui._dl_tablewidget.rowCount()
-        if row_cnt < 1:
-            return
-
-        index = self.ui._dl_tablewidget.currentRow()
-
-        object_id = self._download_list.get_objectid_by_index(index)
-        download_item = self._download_list.get_item_by_objectid(object_id)
-
-        new_index = index + 1
-        
-        if index == row_cnt - 1:
+        # Selected item
+        index = self._current_row()
+        if index == -1:
             return
 
-        self._download_list.move_down(object_id)
+        # Swap data in download_list, the model moves the row
+        new_index = self._table_model.move_row(index, False)
 
-
-
-        self.ui._dl_tablewidget.removeRow(new_index)
-        self.ui._dl_tablewidget.insertRow(new_index)
-        self.ui._dl_tablewidget.selectRow(new_index)
-        
-        self._update_from_item(new_index, download_item)
-
-        object_id = self._download_list.get_objectid_by_index(index)
-        download_item = self._download_list.get_item_by_objectid(object_id)
-
-        self.ui._dl_tablewidget.removeRow(index)
-        self.ui._dl_tablewidget.insertRow(index)
-        self._update_from_item(index, download_item)
+        if new_index != -1:
+            self.ui._dl_tableview.selectRow(new_index)
 
     def _on_start(self, event):
         if self.download_manager is None:
@@ -400,7 +351,7 @@ class MainFrameWnd(QMainWindow):
              self.download_manager.stop_downloads()
 
     def _start_download(self):
-        if self.ui._dl_tablewidget.rowCount() == 0:
+        if self._table_model.rowCount() == 0:
             QMessageBox.information(self, 
                                     'Warning', 
                                     'No items to download', 
@@ -408,10 +359,18 @@ class MainFrameWnd(QMainWindow):
 
         else:
             self._startTimer()
-            self.download_manager = DownloadManager(self, 
-                                                    self._download_list, 
-                                                    self.opt_manager, 
-                                                    self.log_manager)
+
+            if self.opt_manager.options['manager_mode'] == 'asyncio':
+                # asyncio is imported only by the users of this mode
+                from Threads.asyncmanager import AsyncDownloadManager
+                manager_class = AsyncDownloadManager
+            else:
+                manager_class = DownloadManager
+
+            self.download_manager = manager_class(self, 
+                                                  self._download_list, 
+                                                  self.opt_manager, 
+                                                  self.log_manager)
 
             self.ui._downloadBtn.setText(self.STOP_LABEL)
             self.ui._downloadBtn.setToolTip(self.STOP_LABEL)
@@ -422,6 +381,26 @@ class MainFrameWnd(QMainWindow):
 
             self.state = self.RUNNING
 
+    def paintEvent(self, event):
+        super(MainFrameWnd, self).paintEvent(event)
+
+        if self._first_paint:
+            self._first_paint = False
+            # Report once the paint events queued by show() are done
+            QTimer.singleShot(0, self._on_first_paint)
+
+    def _on_first_paint(self):
+        startup_timer.mark('first paint')
+        startup_timer.print_report()
+
+        if startup_timer.exit:
+            # Quit without the confirmation of closeEvent(), nothing
+            # was downloaded yet
+            if self.log_manager is not None:
+                self.log_manager.close()
+
+            QApplication.quit()
+
     def closeEvent(self, event):
         """Event handler for EVT_CLOSE event 
         
@@ -451,7 +430,7 @@ class MainFrameWnd(QMainWindow):
 
     def _on_play(self, event):
 
-        index = self.ui._dl_tablewidget.currentRow()
+        index = self._current_row()
         if index == -1:
             return
 
@@ -470,6 +449,10 @@ class MainFrameWnd(QMainWindow):
             self.download_manager.stop_downloads()
             self.download_manager.join()
 
+        # Write the messages still queued by the log writer
+        if self.log_manager is not None:
+            self.log_manager.close()
+
         # Store options
         self.opt_manager.options['save_path_dirs'] = self.ui._path_combobox.currentText()
 
@@ -484,21 +467,15 @@ class MainFrameWnd(QMainWindow):
             row_number: -1 delete all item, other delete selected row
         """
 
-        row_cnt = len(self._download_list.get_items())
-
-        #row_cnt = self.ui._dl_tablewidget.rowCount()
-        print(row_cnt)
+        row_cnt = self._table_model.rowCount()
         if row_cnt <= 0:
             return
 
-        index = self.ui._dl_tablewidget.currentRow()
-        print(index)
+        index = self._current_row()
         if index == -1: #if there wasn't anything selected, 1st item will be selected
             index = 0
 
-        object_id = self._download_list.get_objectid_by_index(index)
-        self._download_list.remove(object_id)
-        self.ui._dl_tablewidget.removeRow(index)
+        self._table_model.remove_row(index)
 
     def _on_importURL(self):
         file, _ = QFileDialog.getOpenFileName( 
@@ -514,7 +491,6 @@ class MainFrameWnd(QMainWindow):
 
     def _on_add(self, event):
         urls = self._get_urls()
-        self.ui._dl_tablewidget.setRowCount(len(urls))
 
         if not urls:            
             QMessageBox.information(
@@ -524,52 +500,64 @@ class MainFrameWnd(QMainWindow):
             )
         else:
             self.ui._urls_list.clear()
-            options = self._options_parser.parse(self.opt_manager.options)         
+            # Cached by the parser, the same options give the same tuple
+            options = self._options_parser.parse(self.opt_manager.options,
+                                                 self.opt_manager.options['active_profile'])
 
-            for row, url in enumerate(urls):
+            for url in urls:
                 download_item = DownloadItem(url, options)
                 download_item.path = self.opt_manager.options['save_path']
 
-                if not self._download_list.has_item(download_item.object_id):
-                    self._download_list.insert(download_item)
-                    self._binding_data(row, download_item)   
-
+                if self._download_list.add(download_item):
                     #+++++<DEBUG_LOG>
                     logging.debug("%d: %s %s",download_item.object_id, download_item.options, download_item.url)
                     #-----<DEBUG_LOG>                     
 
-    def _binding_data(self, row, download_item):
+            self._table_model.sync_rows()
 
-        self._update_from_item(row, download_item)
+    def _expand_item(self, parent_id, urls):
+        # Add the entries of an expanded playlist as new download items.
+        # Called from the worker thread, the rows are added by the GUI thread.
+        #
+        parent = self._download_list.get_item_by_objectid(parent_id)
+        first_row = len(self._download_list)
 
-    def _update_from_item(self, row, download_item):
+        for url in urls:
+            download_item = DownloadItem(url, parent.options, parent_id)
+            download_item.path = parent.path
 
-        #logging.debug("_update_table_by_item {}".format(row))
+            self._download_list.add(download_item)
 
-        progress_stats = download_item.progress_stats
+        count = len(self._download_list) - first_row
 
-        for key, value in self.LIST_COLUMNS.items():
-        #for column in self.ui._dl_tablewidget.columnCount():
-            column = value[0]
-            
-            if key == 'status' and progress_stats['playlist_index']:
-                # Not the best place but we build the playlist status here
-                status = '{0} {1}/{2}'.format(progress_stats['status'],
-                                              progress_stats['playlist_index'],
-                                              progress_stats['playlist_size'])
-                column_value = QTableWidgetItem(status)                       
-            else:
-                column_value = QTableWidgetItem(progress_stats[key])
+        if count > 0:
+            self.rows_inserted.emit(first_row, count)
 
-            self.ui._dl_tablewidget.setItem(row, column, column_value)
-            self.ui._dl_tablewidget.update()
+    def _on_rows_inserted(self, first_row, count):
+        self._table_model.sync_rows()
 
     def _get_urls(self):
-        urls = set()    # do not allow duplicate values.
-        urls.update(self.ui._urls_list.toPlainText().split('\n'))
-        return [url for url in urls if url]
+        # Urls of the url box in their order, the urls of the same
+        # page (see canonical.canonical_url()) are added once
+        #
+        urls = []
+        seen = set()
+
+        for url in self.ui._urls_list.toPlainText().split('\n'):
+            url = url.strip()
+
+            if url:
+                canonical = canonical_url(url)
+
+                if canonical not in seen:
+                    seen.add(canonical)
+                    urls.append(url)
+
+        return urls
 
     def showAbout(self):
+        from GUI.AboutDlg import AboutDialog
+
         aboutDlg = AboutDialog(self)
         aboutDlg.show()
 
@@ -580,11 +568,30 @@ class MainFrameWnd(QMainWindow):
                                     QMessageBox.Ok)
 
         else:
+            from GUI.logViewerDlg import logViewerDlg
+
             logViewDlg = logViewerDlg(self)
-            logViewDlg.load(self.log_manager.log_file)
+            records = []
+
+            # Show only the records of the selected item if it has any
+            row = self._current_row()
+            if row != -1:
+                object_id = self._download_list.get_objectid_by_index(row)
+                records = self.log_manager.records_for(object_id=object_id)
+
+            if records:
+                logViewDlg.load_records(records)
+            else:
+                self.log_manager.flush()
+                logViewDlg.load(self.log_manager.log_file)
+
             logViewDlg.show()
 
     def _on_settingDlg(self):
+        if self._setting_dlg is None:
+            from GUI.SettingDlg import SettingDlg
+            self._setting_dlg = SettingDlg(self)
+
         self._setting_dlg.show(self)
 
     def batch_file(self):
@@ -613,34 +620,25 @@ class MainFrameWnd(QMainWindow):
         if self.state == self.IDLE:
             self._stopTimer()
 
-        total_percentage = 0.0
-        queued = paused = active = completed = error = 0
-
-        for item in self._download_list.get_items():
-            if item.stage == 'Queued':
-                queued += 1
-            if item.stage == 'Paused':
-                paused += 1
-            if item.stage == 'Active':
-                active += 1
-                total_percentage += float(item.progress_stats["percent"].split('%')[0])
-            if item.stage == 'Completed':
-                completed += 1
-            if item.stage == 'Error':
-                error += 1
-
-        items_count = queued + paused + active + completed + error    
-        total_percentage += completed * 100.0 + error * 100.0
-
-        if items_count:
-            total_percentage /= items_count 
-
-        msg = self.URL_REPORT_MSG.format(total_percentage, queued, paused, active, completed, error)                    
+        # Redraw each updated item once with its latest state
+        for object_id in self._progress_bus.drain():
+            if self._download_list.has_item(object_id):
+                self._table_model.refresh(object_id)
+
+        # The numbers were parsed when the items were updated
+        progress = self._download_list.progress
+
+        stage_counts = [progress.stage_count(stage) for stage in DownloadItem.STAGES]
+
+        msg = self.URL_REPORT_MSG.format(progress.total_percentage(),
+                                         *stage_counts,
+                                         format_bytes(progress.total_speed()),
+                                         format_bytes(progress.remaining_bytes()))
         self._update_status_bar(msg)
 
     def _startTimer(self):
         #logging.info("_startTimer____________")
-        self._app_timer.start(100)
+        self._app_timer.start(1000 // self.opt_manager.options['progress_refresh_rate'])
 
     def _stopTimer(self):
         #logging.info("_stopTimer____________")
@@ -671,13 +669,16 @@ class MainFrameWnd(QMainWindow):
         self.signal, self.data = data
         #logging.info("_download_worker_handler: {0}".format(self.signal))
 
+        if self.signal == 'expand':
+            self._expand_item(self.data['index'], self.data['urls'])
+            return
+
+        # Runs on the worker thread, only update the item here and
+        # leave the redraw to the GUI timer
         download_item = self._download_list.get_item_by_objectid(self.data['index'])
         download_item.update_status(self.data)
 
-        row = self._download_list.index(self.data['index'])
-
-        self.update_date.emit(row, download_item)     # transmit a signal
-        time.sleep(WAIT_TIME)                         # Fired every 0.1 seconds
+        self._progress_bus.post(self.data['index'])
 
     def _download_manager_handler(self, data):
         """downloadmanager.DownloadManager thread handler
@@ -722,10 +723,42 @@ class MainFrameWnd(QMainWindow):
         #                         QMessageBox.Ok)
 
 
+def setup_logging():
+    # Configure the root logger once for all the modules
+    #
+    format = "%(asctime)s: %(message)s"
+    logging.basicConfig(format=format, level=logging.INFO, datefmt='%H:%M:%S')
+    logging.getLogger().setLevel(logging.DEBUG)
+
+
 def main():
+    # In a frozen build the host pool processes run this exe again,
+    # freeze_support() runs the host instead of the GUI there
+    multiprocessing.freeze_support()
+
+    startup_timer.mark('import')
+    setup_logging()
+
+    # Set config path and create options and log managers
+    config_path = get_config_path()
+    opt_manager = OptionsManager(config_path)
+    log_manager = LogManager(config_path, True,
+                             opt_manager.options['log_flush_interval'],
+                             opt_manager.options['log_max_size'],
+                             opt_manager.options['log_backups'],
+                             opt_manager.options['log_format'])
+
+    '''
+    if opt_manager.options['enable_log']:
+        log_manager = LogManager(config_path, opt_manager.options['log_time'])
+    '''
+    startup_timer.mark('managers')
+
     app = QApplication(sys.argv)
     myapp = MainFrameWnd(opt_manager, log_manager)
     myapp.show()
+    startup_timer.mark('window')
+
     sys.exit(app.exec_())
 
 if __name__ == "__main__":